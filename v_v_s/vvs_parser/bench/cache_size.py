@@ -0,0 +1,124 @@
+"""
+Сравнение кеша: старый cache.json (весь файл на каждое обращение) и cache.sqlite (запись на ключ).
+
+Запуск из корня проекта:
+    python bench/cache_size.py              # 100 000 записей
+    python bench/cache_size.py --entries 10000
+
+Для каждого формата: размер файла, чтение одного ключа и запись одного ключа
+при уже заполненном кеше — так работают бот и воркеры; а также загрузка всего
+кеша и память на запись после загрузки (словари из JSON против ProductResult,
+распакованных из ProductResult.pack), по tracemalloc.
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils import cache  # noqa: E402
+from utils.records import ProductResult  # noqa: E402
+
+
+def make_results(n: int):
+    """n результатов, похожих на настоящие (поровну трёх магазинов)."""
+    rnd = random.Random(42)
+    results = {}
+    for i in range(n):
+        site = ("KNS", "Quke", "Vernik")[i % 3]
+        url = f"https://www.{site.lower()}.ru/product/item-{i}-{rnd.randrange(10**9)}/"
+        if site == "KNS":
+            r = ProductResult(site, url, f"Видеокарта Palit GeForce RTX {5000 + i % 100} 16Gb",
+                              rnd.randrange(20_000, 200_000), "16 Гб", "GDDR7")
+        else:
+            r = ProductResult(site, url, f"Apple iPhone {i % 20} 256GB Black",
+                              rnd.randrange(50_000, 300_000), "256GB", color="Black")
+        results[f"{site.upper()}::{url}"] = r
+    return results
+
+
+def timed(fn, repeat: int) -> float:
+    """Среднее время одного вызова, мс."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def load_all(load):
+    """Время загрузки всего кеша (мс) и память загруженной структуры на запись (байт)."""
+    started = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    data = load()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed * 1000, current / len(data)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Размер кеша и цена чтения/записи одного ключа")
+    ap.add_argument("--entries", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    results = make_results(args.entries)
+    keys = list(results)
+    probe = results[keys[len(keys) // 2]]
+    tmp = Path(tempfile.mkdtemp(prefix="vvs-cache-bench-"))
+
+    # Старый формат: {"ключ": {"timestamp": ..., "data": {...}}}, JSON с отступами;
+    # каждое обращение читает весь файл, каждая запись — переписывает его
+    legacy = tmp / "cache.json"
+    data = {k: {"timestamp": time.time(), "data": r.to_dict()} for k, r in results.items()}
+
+    def json_save():
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def json_load():
+        with open(legacy, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    json_save()
+
+    cache.init_cache(tmp / "db")
+    cache.set_cached_many(results)
+
+    def sqlite_size():
+        cache._db().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return sum(p.stat().st_size for p in cache.CACHE_DIR.glob("cache.sqlite*"))
+
+    rows = [
+        ("cache.json", legacy.stat().st_size, timed(json_load, args.repeat),
+         timed(lambda: (json_load(), json_save()), args.repeat)),
+        ("cache.sqlite", sqlite_size(), timed(lambda: cache.get_cached(keys[0]), args.repeat * 100),
+         timed(lambda: cache.set_cached(keys[0], probe), args.repeat * 100)),
+    ]
+
+    loads = [
+        ("cache.json", *load_all(json_load)),
+        ("cache.sqlite", *load_all(cache.load_cache)),
+    ]
+
+    print(f"Записей: {args.entries}\n")
+    print(f"{'формат':<14} {'файл, МБ':>9} {'чтение ключа, мс':>17} {'запись ключа, мс':>17}")
+    for label, size, read_ms, write_ms in rows:
+        print(f"{label:<14} {size / 1024 / 1024:>9.1f} {read_ms:>17.3f} {write_ms:>17.3f}")
+
+    print(f"\n{'формат':<14} {'загрузка всего, мс':>19} {'память/запись':>14}")
+    for label, load_ms, per_entry in loads:
+        print(f"{label:<14} {load_ms:>19.0f} {per_entry:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Поддельный Telegram Bot API для локальной проверки webhook-режима.
+
+1) Запускаем поддельный API:
+    python bench/fake_telegram.py serve --port 8081
+
+2) Запускаем бота против него:
+    TELEGRAM_API_URL=http://127.0.0.1:8081/bot BOT_MODE=webhook \\
+    WEBHOOK_URL=http://127.0.0.1:8443 WEBHOOK_PORT=8443 WEBHOOK_SECRET=local \\
+    PYTHONPATH=. python "bot /bot.py"
+
+   Реплика за балансировщиком (не вызывает setWebhook): добавить WEBHOOK_REGISTER=0.
+
+3) Отправляем боту апдейты, как это делает Telegram:
+    python bench/fake_telegram.py update --webhook http://127.0.0.1:8443/telegram \\
+        --secret local --text /start --count 20
+
+Поддельный API отвечает на getMe, setWebhook, deleteWebhook, sendMessage,
+answerCallbackQuery и печатает каждый вызов — видно, что и когда бот ответил.
+"""
+import argparse
+import itertools
+import json
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot"}
+
+_message_ids = itertools.count(1)
+_lock = threading.Lock()
+# Счётчик вызовов методов — печатается при остановке
+CALLS = {}
+
+
+def _message(params: dict) -> dict:
+    chat_id = int(params.get("chat_id", 0))
+    return {
+        "message_id": next(_message_ids),
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": BOT_USER,
+        "text": params.get("text", ""),
+    }
+
+
+# Ответы на методы Bot API: метод → функция(params) → result
+METHODS = {
+    "getMe": lambda params: BOT_USER,
+    "setWebhook": lambda params: True,
+    "deleteWebhook": lambda params: True,
+    "getUpdates": lambda params: [],
+    "sendMessage": _message,
+    "answerCallbackQuery": lambda params: True,
+}
+
+
+class FakeBotAPI(BaseHTTPRequestHandler):
+    def do_POST(self):
+        # Путь: /bot<token>/<method>
+        method = self.path.rstrip("/").rsplit("/", 1)[-1]
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if "json" in (self.headers.get("Content-Type") or ""):
+            params = json.loads(body or b"{}")
+        else:
+            params = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+
+        with _lock:
+            CALLS[method] = CALLS.get(method, 0) + 1
+
+        handler = METHODS.get(method)
+        if handler is None:
+            payload = {"ok": False, "error_code": 404, "description": f"Not Found: {method}"}
+        else:
+            payload = {"ok": True, "result": handler(params)}
+            text = params.get("text", "").split("\n")[0][:60]
+            print(f"[fake-api] {method} {params.get('chat_id', '')} {text}")
+
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(host: str, port: int):
+    server = ThreadingHTTPServer((host, port), FakeBotAPI)
+    print(f"Поддельный Bot API: http://{host}:{port}/bot  (Ctrl+C — стоп)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\nВызовы: {CALLS}")
+
+
+def make_update(update_id: int, user_id: int, text: str) -> dict:
+    """Апдейт с текстовым сообщением (командой) от пользователя."""
+    user = {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"}
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": user_id, "type": "private"},
+        "from": user,
+        "text": text,
+    }
+    if text.startswith("/"):
+        command = text.split()[0]
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(command)}]
+    return {"update_id": update_id, "message": message}
+
+
+def send_updates(webhook: str, secret: str, text: str, count: int):
+    """Отправляет count апдейтов на webhook бота, как это делает Telegram."""
+    for i in range(count):
+        update = make_update(update_id=i + 1, user_id=1000 + i, text=text)
+        req = urllib.request.Request(
+            webhook,
+            data=json.dumps(update).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        if secret:
+            req.add_header("X-Telegram-Bot-Api-Secret-Token", secret)
+
+        started = time.perf_counter()
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            status = resp.status
+        print(f"update {i + 1}: HTTP {status}, {(time.perf_counter() - started) * 1000:.1f} мс")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Поддельный Telegram Bot API")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p_serve = sub.add_parser("serve", help="запустить поддельный Bot API")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8081)
+
+    p_update = sub.add_parser("update", help="отправить апдейты на webhook бота")
+    p_update.add_argument("--webhook", required=True)
+    p_update.add_argument("--secret", default="")
+    p_update.add_argument("--text", default="/start")
+    p_update.add_argument("--count", type=int, default=1)
+
+    args = ap.parse_args()
+    if args.cmd == "serve":
+        serve(args.host, args.port)
+    else:
+        send_updates(args.webhook, args.secret, args.text, args.count)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
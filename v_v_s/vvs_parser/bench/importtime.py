@@ -0,0 +1,85 @@
+"""
+Отчёт о времени импорта при старте бота (аналог `python -X importtime`).
+
+Запуск из корня проекта:
+    python bench/importtime.py
+    python bench/importtime.py --budget-ms 300 --top 25
+
+Скрипт импортирует модуль handlers в отдельном процессе с -X importtime,
+печатает самые тяжёлые импорты и завершается с кодом 1, если:
+  • общее время импорта превышает бюджет;
+  • при старте подтянулся один из тяжёлых модулей парсеров
+    (они должны загружаться лениво, через parsers.registry).
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BOT_DIR = ROOT / "bot "
+
+# Эти модули не должны импортироваться до первой команды
+HEAVY_MODULES = ["playwright", "bs4", "lxml", "requests", "parsers.quke", "parsers.kns", "parsers.vernik"]
+
+
+def measure(module: str):
+    """Импортирует module в чистом процессе и возвращает [(модуль, self_us, cumulative_us)]."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(ROOT), str(BOT_DIR), env.get("PYTHONPATH", "")])
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Не удалось импортировать {module}:\n{proc.stderr}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # Формат: "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Бюджет времени импорта бота")
+    ap.add_argument("--module", default="handlers", help="какой модуль импортировать")
+    ap.add_argument("--budget-ms", type=float, default=500.0, help="допустимое общее время, мс")
+    ap.add_argument("--top", type=int, default=15, help="сколько самых тяжёлых импортов показать")
+    args = ap.parse_args()
+
+    rows = measure(args.module)
+
+    # Общее время — сумма self по всем модулям
+    total_ms = sum(r[1] for r in rows) / 1000
+    loaded = {r[0].strip() for r in rows}
+
+    print(f"Импорт {args.module}: {len(rows)} модулей, {total_ms:.1f} мс (бюджет {args.budget_ms:.0f} мс)\n")
+    print(f"{'cumulative, мс':>15} {'self, мс':>10}  модуль")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>15.1f} {self_us / 1000:>10.1f}  {name}")
+
+    failed = False
+
+    heavy = [m for m in HEAVY_MODULES if m in loaded]
+    if heavy:
+        print(f"\n❌ При старте импортированы тяжёлые модули: {', '.join(heavy)}")
+        failed = True
+
+    if total_ms > args.budget_ms:
+        print(f"\n❌ Бюджет превышен: {total_ms:.1f} мс > {args.budget_ms:.0f} мс")
+        failed = True
+
+    if not failed:
+        print("\n✅ Бюджет старта соблюдён")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
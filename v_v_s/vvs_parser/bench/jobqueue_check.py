@@ -0,0 +1,119 @@
+"""
+Проверка гарантий очереди задач (utils/jobqueue.py) на нескольких процессах.
+
+Запуск из корня проекта:
+    python bench/jobqueue_check.py
+    python bench/jobqueue_check.py --procs 8 --jobs 1000
+
+Проверяется (код выхода 1, если что-то нарушено):
+  • каждую задачу забирает ровно один воркер, все задачи завершаются;
+  • задачу с истёкшей арендой забирает другой воркер;
+  • complete() воркера, чья аренда истекла, отклоняется.
+Очередь создаётся во временной папке, аренда — короткая.
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.jobqueue import JobQueue  # noqa: E402
+
+# Короткая аренда — проверка истечения занимает секунды
+LEASE_SECONDS = 1
+
+
+def drain(path: str, n: int, claimed):
+    """Воркер: забирает и завершает задачи, пока очередь не опустеет."""
+    queue = JobQueue(path, lease_seconds=LEASE_SECONDS)
+    worker = f"w{n}"
+    ids = []
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            break
+        if queue.complete(job["id"], worker):
+            ids.append(job["id"])
+    queue.close()
+    claimed.put(ids)
+
+
+def check_single_claim(path: Path, procs: int, jobs: int) -> list:
+    queue = JobQueue(path, lease_seconds=LEASE_SECONDS)
+    for n in range(jobs):
+        queue.enqueue("kns", f"https://example.com/product/{n}/")
+
+    claimed = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=drain, args=(str(path), n, claimed)) for n in range(procs)]
+    started = time.perf_counter()
+    for p in workers:
+        p.start()
+    results = [claimed.get() for _ in workers]
+    for p in workers:
+        p.join()
+    elapsed = time.perf_counter() - started
+
+    counts = Counter(job_id for ids in results for job_id in ids)
+    stats = queue.stats()
+    queue.close()
+
+    print(f"{procs} процессов, {jobs} задач: {elapsed:.2f} с, по воркерам {[len(ids) for ids in results]}")
+    print(f"  статусы: {stats}")
+
+    errors = []
+    if len(counts) != jobs:
+        errors.append(f"завершено {len(counts)} задач из {jobs}")
+    twice = [job_id for job_id, n in counts.items() if n > 1]
+    if twice:
+        errors.append(f"задачи завершены дважды: {twice[:10]}")
+    if stats != {"done": jobs}:
+        errors.append(f"не все задачи done: {stats}")
+    return errors
+
+
+def check_lease_expiry(path: Path) -> list:
+    queue = JobQueue(path, lease_seconds=LEASE_SECONDS)
+    queue.enqueue("kns", "https://example.com/product/slow/")
+
+    errors = []
+    stale = queue.claim("stale")
+    if queue.claim("other") is not None:
+        errors.append("задачу с действующей арендой выдали второму воркеру")
+
+    time.sleep(LEASE_SECONDS + 0.2)
+    fresh = queue.claim("other")
+    if fresh is None or fresh["id"] != stale["id"]:
+        errors.append("задачу с истёкшей арендой не выдали другому воркеру")
+    if queue.complete(stale["id"], "stale"):
+        errors.append("complete() воркера с истёкшей арендой принят")
+    if fresh is not None and not queue.complete(fresh["id"], "other"):
+        errors.append("complete() нового владельца аренды отклонён")
+
+    print(f"истечение аренды ({LEASE_SECONDS} с): {'ok' if not errors else 'ошибка'}, статусы {queue.stats()}")
+    queue.close()
+    return errors
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Проверка аренды задач в очереди")
+    ap.add_argument("--procs", type=int, default=6)
+    ap.add_argument("--jobs", type=int, default=300)
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="vvs-jobqueue-"))
+    errors = check_single_claim(tmp / "drain.sqlite", args.procs, args.jobs)
+    errors += check_lease_expiry(tmp / "lease.sqlite")
+
+    for e in errors:
+        print(f"[FAIL] {e}")
+    print("OK" if not errors else "FAILED")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Нагрузочный тест обработчиков бота: N одновременных пользователей.
+
+Запуск из корня проекта:
+    python bench/loadtest.py --users 50 --rounds 3
+    python bench/loadtest.py --users 20 --commands start,kns,btn:vernik,all --cache cold
+    python bench/loadtest.py --sites quke,kns,vernik   # с Quke (нужен Chromium для Playwright)
+
+Что делает:
+  • поднимает локальный replay-сервер со страницами магазинов (из --fixtures
+    или синтетические, с задержкой --page-ms); список товаров подменяется ссылками на него;
+  • каждый пользователь по очереди вызывает start_handler, обработчики магазинов
+    и button_router через поддельные Update/CallbackQuery;
+  • ответы уходят в заглушку Telegram с задержкой --send-ms (как RTT до Bot API).
+
+Отчёт: p50/p99/max задержки по каждой команде, лаг event loop,
+максимум одновременно запущенных браузеров и RSS процесса (и браузеров).
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "bot ")]
+
+
+# Replay-сервер со страницами магазинов
+
+def synthetic_page(site: str, n: int) -> str:
+    """Страница товара в разметке, которую ждут селекторы parsers/sites.py."""
+    price = 50_000 + n * 1_000
+    if site == "kns":
+        return (
+            f"<h1>Видеокарта Test RTX {n} 16Gb</h1>"
+            f'<meta itemprop="price" content="{price}">'
+            '<div class="row no-gutters my-2 align-items-end">'
+            '<div class="field-ex-name">Объем видеопамяти</div><div data-id="1">16 Гб смотреть</div></div>'
+            '<div class="row no-gutters my-2 align-items-end">'
+            '<div class="field-ex-name">Тип видеопамяти</div><div data-id="2">GDDR7 смотреть</div></div>'
+        )
+    if site == "quke":
+        return f'<h1>Apple iPhone {n} 256GB Black</h1><a data-price="{price}">Купить</a>'
+    return f'<div class="product-price">{price} ₽</div>'
+
+
+def start_replay_server(fixtures, page_ms: float):
+    """Запускает сервер в фоновом потоке и возвращает его базовый адрес."""
+
+    class Replay(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if page_ms:
+                time.sleep(page_ms / 1000)
+
+            # /<site>/<n> → fixtures/<site>/<n>.html, иначе синтетическая страница
+            m = re.match(r"^/(\w+)/(\d+)", self.path)
+            body = None
+            if fixtures and m:
+                path = Path(fixtures) / m.group(1) / f"{m.group(2)}.html"
+                if path.exists():
+                    body = path.read_bytes()
+            if body is None:
+                site, n = (m.group(1), int(m.group(2))) if m else ("vernik", 0)
+                body = synthetic_page(site, n).encode()
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Replay)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# Поддельные объекты Telegram
+
+class StubSender:
+    """Заглушка отправки: считает сообщения и имитирует RTT до Bot API."""
+
+    def __init__(self, send_ms: float):
+        self.send_ms = send_ms
+        self.sent = 0
+
+    async def reply_text(self, text, **kwargs):
+        self.sent += 1
+        if self.send_ms:
+            await asyncio.sleep(self.send_ms / 1000)
+
+
+class FakeMessage:
+    def __init__(self, sender: StubSender):
+        self.reply_text = sender.reply_text
+
+
+class FakeCallbackQuery:
+    def __init__(self, data: str, sender: StubSender):
+        self.data = data
+        self.message = FakeMessage(sender)
+
+    async def answer(self):
+        pass
+
+
+class FakeUpdate:
+    def __init__(self, sender: StubSender, text=None, callback_data=None):
+        self.message = FakeMessage(sender) if text else None
+        self.callback_query = FakeCallbackQuery(callback_data, sender) if callback_data else None
+
+
+# Метрики процесса
+
+def browser_processes():
+    """PID процессов Chromium (запущенных Playwright)."""
+    pids = []
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            name = Path(f"/proc/{pid}/comm").read_text().strip()
+        except OSError:
+            continue
+        if "chrom" in name or "headless_shell" in name:
+            pids.append(pid)
+    return pids
+
+
+def rss_mb(pid="self") -> float:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+class Monitor:
+    """Фоновый замер: лаг event loop, число браузеров, RSS."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags = []
+        self.max_browsers = 0
+        self.max_rss = 0.0
+        self.max_browser_rss = 0.0
+        self._stop = False
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        last_sample = 0.0
+        while not self._stop:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - started - self.interval))
+
+            # /proc читаем реже, чтобы сам замер не грузил цикл
+            if started - last_sample > 0.2:
+                last_sample = started
+                pids = browser_processes()
+                self.max_browsers = max(self.max_browsers, len(pids))
+                self.max_rss = max(self.max_rss, rss_mb())
+                self.max_browser_rss = max(self.max_browser_rss, sum(rss_mb(p) for p in pids))
+
+    def stop(self):
+        self._stop = True
+
+
+def percentile(values, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+# Сценарий
+
+async def run_user(user_id: int, commands, rounds: int, send_ms: float, latencies, sent):
+    import handlers
+
+    sender = StubSender(send_ms)
+
+    # Пользователи стартуют не одновременно, как в жизни
+    await asyncio.sleep(random.random() * 0.1)
+
+    for _ in range(rounds):
+        for cmd in commands:
+            started = time.perf_counter()
+
+            if cmd == "start":
+                await handlers.start_handler(FakeUpdate(sender, text="/start"), None)
+            elif cmd.startswith("btn:"):
+                await handlers.button_router(FakeUpdate(sender, callback_data=cmd[4:]), None)
+            elif cmd == "all":
+                await handlers.all_handler(FakeUpdate(sender, text="/all"), None)
+            else:
+                await handlers.SITE_HANDLERS[cmd](FakeUpdate(sender, text=f"/{cmd}"), None)
+
+            latencies.setdefault(cmd, []).append(time.perf_counter() - started)
+
+    sent.append(sender.sent)
+
+
+async def main_async(args):
+    from utils.cache import init_cache
+    init_cache(tempfile.mkdtemp(prefix="vvs-loadtest-"))
+
+    import handlers
+    import parsers.engine as engine
+    from utils.products import CATALOG
+
+    base = start_replay_server(args.fixtures, args.page_ms)
+    sites = args.sites.split(",")
+
+    products = {
+        site: [
+            {"name": f"{site} товар {n}", "url": f"{base}/{site}/{n}"}
+            for n in range(args.products)
+        ]
+        for site in ["quke", "kns", "vernik"]
+    }
+    # Магазины, не участвующие в тесте, — пустые
+    for site in products:
+        if site not in sites:
+            products[site] = []
+
+    # Подменяем products.json: обработчики берут товары из CATALOG
+    products_file = Path(tempfile.mkdtemp(prefix="vvs-loadtest-")) / "products.json"
+    products_file.write_text(json.dumps(products, ensure_ascii=False), encoding="utf-8")
+    CATALOG.path = products_file
+    CATALOG.load()
+
+    if "quke" in sites:
+        engine.HEADLESS = True
+
+    if args.cache == "cold":
+        # Каждая команда заново ходит на replay-сервер
+        engine.get_cached = lambda *a, **kw: None
+        engine.get_cached_entry = lambda *a, **kw: None
+
+    monitor = Monitor()
+    monitor_task = asyncio.create_task(monitor.run())
+
+    latencies, sent = {}, []
+    started = time.perf_counter()
+
+    # Парсеры печатают каждый запрос — в отчёт это не нужно
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        await asyncio.gather(*(
+            run_user(i, args.commands.split(","), args.rounds, args.send_ms, latencies, sent)
+            for i in range(args.users)
+        ))
+    elapsed = time.perf_counter() - started
+
+    monitor.stop()
+    await monitor_task
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"\nПользователей: {args.users}, раундов: {args.rounds}, магазины: {args.sites}, "
+          f"товаров на магазин: {args.products}, кеш: {args.cache}")
+    print(f"Команд: {total} за {elapsed:.1f} с ({total / elapsed:.1f} команд/с), "
+          f"сообщений отправлено: {sum(sent)}\n")
+
+    print(f"{'команда':<12} {'n':>5} {'p50, мс':>10} {'p99, мс':>10} {'max, мс':>10}")
+    for cmd, values in latencies.items():
+        print(f"{cmd:<12} {len(values):>5} {percentile(values, 50) * 1000:>10.1f} "
+              f"{percentile(values, 99) * 1000:>10.1f} {max(values) * 1000:>10.1f}")
+
+    print(f"\nЛаг event loop: p50 {percentile(monitor.lags, 50) * 1000:.1f} мс, "
+          f"p99 {percentile(monitor.lags, 99) * 1000:.1f} мс, max {max(monitor.lags, default=0) * 1000:.1f} мс")
+    print(f"Браузеров одновременно (max): {monitor.max_browsers}, RSS браузеров (max): {monitor.max_browser_rss:.0f} МБ")
+    print(f"RSS процесса: max {monitor.max_rss:.0f} МБ, "
+          f"пик {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} МБ")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Нагрузочный тест обработчиков бота")
+    ap.add_argument("--users", type=int, default=20, help="одновременных пользователей")
+    ap.add_argument("--rounds", type=int, default=2, help="сколько раз каждый проходит сценарий")
+    ap.add_argument("--commands", default="start,kns,btn:vernik,all",
+                    help="сценарий: start, all, <магазин>, btn:<callback_data>")
+    ap.add_argument("--sites", default="kns,vernik", help="магазины в тесте (quke требует Chromium)")
+    ap.add_argument("--products", type=int, default=10, help="товаров на магазин")
+    ap.add_argument("--cache", choices=["warm", "cold"], default="warm",
+                    help="cold — кеш парсеров отключён, каждая команда идёт на сервер")
+    ap.add_argument("--page-ms", type=float, default=50, help="задержка ответа страницы магазина")
+    ap.add_argument("--send-ms", type=float, default=30, help="задержка отправки сообщения в Telegram")
+    ap.add_argument("--fixtures", default=None, help="папка с сохранёнными страницами <site>/<n>.html")
+    ap.add_argument("--verbose", action="store_true", help="не глушить вывод парсеров")
+    args = ap.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,22 @@
+import asyncio
 import logging
 import os
+import threading
 from dotenv import load_dotenv
 from telegram.ext import ApplicationBuilder, CommandHandler, CallbackQueryHandler
 
+from utils.cache import init_cache
+from utils.products import CATALOG
+from utils.matching import INDEX
+
 # Импортируем обработчики из handlers.py
+# (парсеры внутри подгружаются лениво — при первой команде)
 from handlers import (
     start_handler,
     button_router,
-    quke_handler,
-    kns_handler,
-    vernik_handler,
-    all_handler
+    all_handler,
+    cheapest_handler,
+    SITE_HANDLERS
 )
 
 # Загружаем переменные окружения (.env)
@@ -21,6 +27,42 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 if not BOT_TOKEN:
     raise RuntimeError("❌ BOT_TOKEN не найден в .env! Добавьте BOT_TOKEN=<ваш токен>")
 
+# Режим работы: "polling" (по умолчанию) или "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+
+# Webhook: публичный адрес (за reverse proxy), путь и адрес встроенного сервера
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
+# Регистрировать webhook в Telegram при старте.
+# Несколько реплик за балансировщиком: WEBHOOK_REGISTER=1 ровно у одной
+# (она вызывает setWebhook с общим WEBHOOK_URL балансировщика), у остальных — 0:
+# они только принимают апдейты (bot/webhook.py) и webhook не перезаписывают.
+# Кеш и очередь задач — SQLite в WAL, который работает только в пределах одной
+# машины: реплики запускаются на том же хосте, что и кеш (общая папка cache/).
+# Реплика на другом хосте должна получить свою папку кеша — тогда у неё свой
+# кеш, индекс цен и очередь, и ответы реплик могут расходиться до обновления цен.
+WEBHOOK_REGISTER = os.getenv("WEBHOOK_REGISTER", "1") == "1"
+
+# Сколько апдейтов обрабатывать одновременно и пул соединений к Telegram API
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "16"))
+CONNECTION_POOL_SIZE = int(os.getenv("CONNECTION_POOL_SIZE", str(CONCURRENT_UPDATES * 2)))
+POOL_TIMEOUT = float(os.getenv("POOL_TIMEOUT", "10"))
+
+# Сколько одновременных соединений Telegram открывает к webhook (допустимо 1–100)
+WEBHOOK_MAX_CONNECTIONS = max(1, min(100, CONCURRENT_UPDATES))
+
+# Адрес Bot API (для локальной проверки — bench/fake_telegram.py)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org/bot")
+
+if BOT_MODE not in ("polling", "webhook"):
+    raise RuntimeError(f"❌ Неизвестный BOT_MODE={BOT_MODE}: нужен polling или webhook")
+
+if BOT_MODE == "webhook" and WEBHOOK_REGISTER and not WEBHOOK_URL:
+    raise RuntimeError("❌ Для BOT_MODE=webhook нужен WEBHOOK_URL=<https://ваш-домен>")
+
 # Настройка логирования (INFO — только важные события)
 logging.basicConfig(
     level=logging.INFO,
@@ -29,23 +71,74 @@ logging.basicConfig(
 logger = logging.getLogger("TelegramBot")
 
 
-def main():
-    print("🚀 Запуск Telegram-бота...")
-    print("Загружаем обработчики, читаем конфигурацию…")
-
-    # Создаём экземпляр Telegram-приложения
-    app = ApplicationBuilder().token(BOT_TOKEN).build()
+def build_app():
+    """Создаёт Telegram-приложение со всеми обработчиками."""
+    app = (
+        ApplicationBuilder()
+        .token(BOT_TOKEN)
+        .base_url(TELEGRAM_API_URL)
+        # Апдейты разных пользователей обрабатываются параллельно
+        .concurrent_updates(CONCURRENT_UPDATES)
+        # Пул HTTP-соединений под параллельные ответы
+        .connection_pool_size(CONNECTION_POOL_SIZE)
+        .pool_timeout(POOL_TIMEOUT)
+        .build()
+    )
 
     # Регистрируем команды
     app.add_handler(CommandHandler("start", start_handler))
-    app.add_handler(CommandHandler("quke", quke_handler))
-    app.add_handler(CommandHandler("kns", kns_handler))
-    app.add_handler(CommandHandler("vernik", vernik_handler))
     app.add_handler(CommandHandler("all", all_handler))
+    app.add_handler(CommandHandler("cheapest", cheapest_handler))
+
+    # Команды магазинов — по реестру parsers/sites.py (/quke, /kns, /vernik, …)
+    for command, handler in SITE_HANDLERS.items():
+        app.add_handler(CommandHandler(command, handler))
 
     # Регистрируем обработчик inline-кнопок
     app.add_handler(CallbackQueryHandler(button_router))
 
+    return app
+
+
+def main():
+    print("🚀 Запуск Telegram-бота...")
+    print("Загружаем обработчики, читаем конфигурацию…")
+
+    # Готовим папку кеша
+    init_cache()
+
+    # Индекс /cheapest из свежих цен кеша строится в фоне — бот отвечает сразу
+    threading.Thread(target=INDEX.refresh_from_cache, daemon=True).start()
+
+    # Проверяем products.json сразу — ошибка в конфиге видна при старте, а не на первой команде
+    CATALOG.load()
+
+    # Создаём экземпляр Telegram-приложения
+    app = build_app()
+
+    if BOT_MODE == "webhook" and not WEBHOOK_REGISTER:
+        print(f"🤖 Бот запущен (webhook, реплика без регистрации)! "
+              f"Слушаю {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH}\n")
+
+        # run_webhook всегда вызывает setWebhook — реплика поднимает свой сервер
+        from webhook import serve_webhook
+        asyncio.run(serve_webhook(app, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET))
+        return
+
+    if BOT_MODE == "webhook":
+        print(f"🤖 Бот запущен (webhook)! Слушаю {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH}\n")
+
+        # Встроенный webhook-сервер python-telegram-bot (нужен tornado) + setWebhook
+        app.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+        )
+        return
+
     print("🤖 Бот запущен! Ожидаю команды…\n")
 
     # Запускаем бота в режиме polling
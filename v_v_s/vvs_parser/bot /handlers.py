@@ -1,3 +1,5 @@
+import asyncio
+
 from telegram import (
     Update,
     InlineKeyboardButton,
@@ -5,34 +7,40 @@ from telegram import (
 )
 from telegram.ext import ContextTypes
 
-from utils.products import load_products
-from parsers.quke import parse_quke_list_async
-from parsers.kns import parse_kns_list
-from parsers.vernik import parse_vernik
+from utils.products import CATALOG
+from utils.matching import INDEX
+from utils.cache import delete_cached
+from parsers.sites import SITES
+# Парсеры загружаются лениво — при первой команде, а не при старте бота
+from parsers.registry import get_parser
+from render import render, clear as clear_rendered, md
 
 
-# Главное меню бота — Inline-кнопки для выбора магазина
+# Главное меню бота — Inline-кнопки для выбора магазина (по две в ряд)
 def main_menu():
-    keyboard = [
-        [
-            InlineKeyboardButton("🔵 QUKE", callback_data="quke"),
-            InlineKeyboardButton("🟣 KNS", callback_data="kns"),
-        ],
-        [
-            InlineKeyboardButton("🟡 VERNIK", callback_data="vernik"),
-            InlineKeyboardButton("🌐 ВСЁ", callback_data="all"),
-        ]
-    ]
+    buttons = [InlineKeyboardButton(s.button, callback_data=key) for key, s in SITES.items()]
+    buttons.append(InlineKeyboardButton("🌐 ВСЁ", callback_data="all"))
+
+    keyboard = [buttons[i:i + 2] for i in range(0, len(buttons), 2)]
     return InlineKeyboardMarkup(keyboard)
 
+
+# Выбираем способ отправки (из callback или из чата)
+def get_sender(update: Update, is_callback: bool):
+    return (
+        update.callback_query.message.reply_text
+        if is_callback else update.message.reply_text
+    )
+
+
 # /start — первое сообщение пользователю
 async def start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    sites = "\n".join(f"• {s.about}" for s in SITES.values())
     text = (
         "Привет! 👋\n\n"
         "Этот бот умеет парсить цены с сайтов:\n"
-        "• Quke.ru (Playwright)\n"
-        "• KNS.ru (Requests + BS4)\n"
-        "• Vernik.me\n\n"
+        f"{sites}\n\n"
+        "Найти, где дешевле: /cheapest iPhone 17 Pro 512GB Silver\n\n"
         "Выбери магазин ниже:"
     )
 
@@ -46,165 +54,128 @@ async def button_router(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()  # Telegram требует подтверждать callback
     action = query.data
 
-    if action == "quke":
-        await quke_handler(update, context, is_callback=True)
-    elif action == "kns":
-        await kns_handler(update, context, is_callback=True)
-    elif action == "vernik":
-        await vernik_handler(update, context, is_callback=True)
-    elif action == "all":
+    if action == "all":
         await all_handler(update, context, is_callback=True)
+    elif action in SITE_HANDLERS:
+        await SITE_HANDLERS[action](update, context, is_callback=True)
 
 
-# Обработчик QUKE (асинхронный)
-async def quke_handler(update: Update, context: ContextTypes.DEFAULT_TYPE, is_callback=False):
-    # Загружаем ссылки из products.json
-    products = load_products()
-    urls = [p["url"] for p in products["quke"]]
-
-    # Выбираем способ отправки (из callback или из чата)
-    send = (
-        update.callback_query.message.reply_text
-        if is_callback else update.message.reply_text
-    )
-
-    await send("⌛ Парсим Quke…")
-
-    # Асинхронный список парсеров
-    items = await parse_quke_list_async(urls)
-
-    # Фильтруем только те, у которых есть цена
-    items = [x for x in items if x.get("price")]
+# Обработчик одного магазина — один на все сайты из parsers/sites.py
+def make_site_handler(key: str):
+    site = SITES[key]
 
-    if not items:
-        await send("❌ Не удалось получить данные с Quke.")
-        return
-
-    # Красивый вывод каждого товара
-    for item in items:
-        keyboard = InlineKeyboardMarkup(
-            [[InlineKeyboardButton("Открыть товар", url=item["url"])]]
+    # Карточка одного товара
+    def card(item):
+        return (
+            f"{site.icon} *{md(item.name)}*\n"
+            f"💰 Цена: *{item.price} ₽*"
         )
 
-        text = (
-            f"📱 *{item['name']}*\n"
-            f"💰 Цена: *{item['price']} ₽*"
-        )
+    async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE, is_callback=False):
+        send = get_sender(update, is_callback)
 
-        await send(text, parse_mode="Markdown", reply_markup=keyboard)
+        await send(f"⌛ Парсим {site.title}…")
 
-    # Возвращаем меню выбора магазина
-    await send("Готово! Выбери следующий магазин:", reply_markup=main_menu())
+        # Ссылки и категории из products.json (индекс в памяти); парсинг — в отдельном потоке
+        items = await get_parser("collect_async")(key)
 
+        # Фильтруем только те, у которых есть цена
+        items = [x for x in items if x.price]
 
-# Обработчик KNS
-async def kns_handler(update: Update, context: ContextTypes.DEFAULT_TYPE, is_callback=False):
-    products = load_products()
-    urls = [p["url"] for p in products["kns"]]
-
-    send = (
-        update.callback_query.message.reply_text
-        if is_callback else update.message.reply_text
-    )
+        if not items:
+            await send(f"❌ {site.title} не вернул данные.")
+            return
 
-    await send("⌛ Парсим KNS…")
+        # Карточки товаров, упакованные в минимум сообщений (с кешем готовых сообщений)
+        for text, keyboard in render(key, items, card):
+            await send(text, parse_mode="Markdown", reply_markup=keyboard)
 
-    items = parse_kns_list(urls)
-    items = [x for x in items if x.get("price")]
+        # Возвращаем меню выбора магазина
+        await send("Готово! Выбери следующий магазин:", reply_markup=main_menu())
 
-    if not items:
-        await send("❌ KNS не вернул данные.")
-        return
+    handler.__name__ = f"{key}_handler"
+    return handler
 
-    for item in items:
-        keyboard = InlineKeyboardMarkup(
-            [[InlineKeyboardButton("Открыть товар", url=item["url"])]]
-        )
 
-        text = (
-            f"🟣 *{item['name']}*\n"
-            f"💰 Цена: *{item['price']} ₽*"
-        )
+# Обработчики магазинов: {"quke": ..., "kns": ..., "vernik": ...}
+SITE_HANDLERS = {key: make_site_handler(key) for key in SITES}
 
-        await send(text, parse_mode="Markdown", reply_markup=keyboard)
 
-    await send("Выбери следующий магазин:", reply_markup=main_menu())
+# Карточка товара в общем списке — с названием магазина
+def all_card(item):
+    return (
+        f"🛒 *{md(item.site)}*\n"
+        f"{md(item.name)}\n"
+        f"💰 *{item.price} ₽*"
+    )
 
 
-# Обработчик VERNIK
-async def vernik_handler(update: Update, context: ContextTypes.DEFAULT_TYPE, is_callback=False):
-    products = load_products()
+# Обработчик: собрать данные со всех сайтов
+async def all_handler(update: Update, context: ContextTypes.DEFAULT_TYPE, is_callback=False):
+    send = get_sender(update, is_callback)
 
-    send = (
-        update.callback_query.message.reply_text
-        if is_callback else update.message.reply_text
-    )
+    await send("⌛ Собираю данные со всех сайтов…")
 
-    await send("⌛ Парсим Vernik…")
+    # Все магазины парсятся параллельно
+    by_site = await get_parser("collect_all_async")()
 
-    # Каждый товар парсится отдельно
-    items = [parse_vernik(p["url"], p["name"]) for p in products["vernik"]]
-    items = [x for x in items if x.get("price")]
+    # Оставляем только товары с ценой
+    all_items = [x for items in by_site.values() for x in items if x.price]
 
-    if not items:
-        await send("❌ Vernik не вернул данные.")
+    if not all_items:
+        await send("❌ Не удалось получить данные ни с одного сайта.")
         return
 
-    for item in items:
-        keyboard = InlineKeyboardMarkup(
-            [[InlineKeyboardButton("Открыть товар", url=item["url"])]]
-        )
+    # Отправляем товары пачками — несколько карточек в одном сообщении
+    for text, keyboard in render("all", all_items, all_card):
+        await send(text, parse_mode="Markdown", reply_markup=keyboard)
 
-        text = (
-            f"🟡 *{item['name']}*\n"
-            f"💰 Цена: *{item['price']} ₽*"
-        )
+    await send("Готово! Выбери магазин:", reply_markup=main_menu())
 
-        await send(text, parse_mode="Markdown", reply_markup=keyboard)
 
-    await send("Выбери следующий магазин:", reply_markup=main_menu())
+# Сколько предложений показывать в /cheapest
+CHEAPEST_LIMIT = 10
 
 
-# Обработчик: собрать данные со всех сайтов
-async def all_handler(update: Update, context: ContextTypes.DEFAULT_TYPE, is_callback=False):
-    send = (
-        update.callback_query.message.reply_text
-        if is_callback else update.message.reply_text
+# Карточка предложения в /cheapest
+def offer_card(item):
+    return (
+        f"🛒 *{md(item.site)}* — *{item.price} ₽*\n"
+        f"{md(item.name)}"
     )
 
-    await send("⌛ Собираю данные со всех сайтов…")
 
-    products = load_products()
+# /cheapest <запрос> — где товар дешевле всего (по индексу, без нового парсинга)
+async def cheapest_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = " ".join(context.args or []).strip()
 
-    # Получаем товары от всех парсеров
-    quke_items = await parse_quke_list_async([p["url"] for p in products["quke"]])
-    kns_items = parse_kns_list([p["url"] for p in products["kns"]])
-    vernik_items = [parse_vernik(p["url"], p["name"]) for p in products["vernik"]]
+    if not query:
+        await update.message.reply_text("Напиши, что искать: /cheapest iPhone 17 Pro 512GB Silver")
+        return
 
-    # Оставляем только товары с ценой
-    all_items = [
-        *[x for x in quke_items if x.get("price")],
-        *[x for x in kns_items if x.get("price")],
-        *[x for x in vernik_items if x.get("price")]
-    ]
+    # Результаты, записанные в кеш воркерами, тоже попадают в индекс
+    # (только новые записи; чтение базы — не в event loop)
+    await asyncio.to_thread(INDEX.refresh_from_cache)
+    offers = INDEX.cheapest(query)[:CHEAPEST_LIMIT]
 
-    if not all_items:
-        await send("❌ Не удалось получить данные ни с одного сайта.")
+    if not offers:
+        await update.message.reply_text(
+            "❌ Предложений не найдено. Обнови цены командой магазина или /all.",
+            reply_markup=main_menu(),
+        )
         return
-        
 
-    # Отправляем товары по одному
-    for item in all_items:
-        keyboard = InlineKeyboardMarkup(
-            [[InlineKeyboardButton("Открыть товар", url=item["url"])]]
-        )
+    for text, keyboard in render("cheapest", offers, offer_card):
+        await update.message.reply_text(text, parse_mode="Markdown", reply_markup=keyboard)
 
-        text = (
-            f"🛒 *{item['site']}*\n"
-            f"{item['name']}\n"
-            f"💰 *{item['price']} ₽*"
-        )
 
-        await send(text, parse_mode="Markdown", reply_markup=keyboard)
+# Правка products.json на ходу: убранные товары пропадают из кеша и /cheapest,
+# готовые сообщения собираются заново по новому списку
+def on_products_changed(added, removed):
+    for site, url, name in removed:
+        INDEX.remove(url)
+    delete_cached(SITES[site].cache_key(url, name) for site, url, name in removed)
+    clear_rendered()
 
-    await send("Готово! Выбери магазин:", reply_markup=main_menu())
+
+CATALOG.subscribe(on_products_changed)
@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Tuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.helpers import escape_markdown
+
+from utils.records import ProductResult
+
+# Кеш готовых к отправке сообщений с товарами.
+# Ключ — (раздел, версия результатов): пока цены не изменились,
+# повторный /all или /kns — это поиск в словаре и пара отправок.
+
+# Ограничения Telegram: длина текста сообщения и число кнопок под ним
+MAX_MESSAGE_LEN = 4096
+MAX_BUTTONS = 100
+
+# Сколько разных наборов держать в памяти (старые вытесняются)
+CACHE_SIZE = 64
+
+# Готовое сообщение: (текст в Markdown, клавиатура)
+Payload = Tuple[str, InlineKeyboardMarkup]
+
+_cache: "OrderedDict[tuple, List[Payload]]" = OrderedDict()
+
+# clear() вызывается и из потока перезагрузки products.json, не только из цикла бота
+_lock = threading.Lock()
+
+
+def md(text) -> str:
+    """Экранирование для parse_mode="Markdown" — одно «_» в названии ломает всё сообщение."""
+    return escape_markdown(str(text), version=1)
+
+
+def items_version(items: List[ProductResult]) -> int:
+    """Версия набора результатов: меняется, если поменялись товары или цены."""
+    return hash(tuple((x.site, x.url, x.name, x.price) for x in items))
+
+
+def _button(n: int, item: ProductResult) -> InlineKeyboardButton:
+    name = item.name or "Открыть товар"
+    label = f"{n}. {name}"
+    return InlineKeyboardButton(label if len(label) <= 40 else label[:39] + "…", url=item.url)
+
+
+def pack(items: List[ProductResult], card: Callable[[ProductResult], str]) -> List[Payload]:
+    """
+    Упаковывает карточки товаров в как можно меньше сообщений:
+    текст до 4096 символов, под ним — кнопки-ссылки с тем же номером.
+    """
+    payloads = []
+    parts, buttons, length = [], [], 0
+
+    for n, item in enumerate(items, start=1):
+        text = f"{n}. {card(item)}"[:MAX_MESSAGE_LEN]
+        extra = len(text) + (2 if parts else 0)  # "\n\n" между карточками
+
+        if parts and (length + extra > MAX_MESSAGE_LEN or len(buttons) >= MAX_BUTTONS):
+            payloads.append(("\n\n".join(parts), InlineKeyboardMarkup(buttons)))
+            parts, buttons, length = [], [], 0
+            extra = len(text)
+
+        parts.append(text)
+        buttons.append([_button(n, item)])
+        length += extra
+
+    if parts:
+        payloads.append(("\n\n".join(parts), InlineKeyboardMarkup(buttons)))
+
+    return payloads
+
+
+def render(scope: str, items: List[ProductResult], card: Callable[[ProductResult], str]) -> List[Payload]:
+    """Готовые сообщения для набора товаров — из кеша, если набор не менялся."""
+    key = (scope, items_version(items))
+
+    with _lock:
+        payloads = _cache.get(key)
+        if payloads is not None:
+            _cache.move_to_end(key)
+            return payloads
+
+    payloads = pack(items, card)
+    with _lock:
+        _cache[key] = payloads
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return payloads
+
+
+def clear() -> None:
+    """Сбросить готовые сообщения (например, после правки products.json)."""
+    with _lock:
+        _cache.clear()
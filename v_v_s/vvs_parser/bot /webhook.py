@@ -0,0 +1,64 @@
+import asyncio
+import hmac
+import json
+import signal
+
+import tornado.httpserver
+import tornado.web
+from telegram import Update
+
+# Webhook-сервер для реплик за балансировщиком.
+# app.run_webhook() всегда вызывает setWebhook (без webhook_url — с адресом
+# вида http://0.0.0.0:<порт>/<путь>), поэтому реплики с WEBHOOK_REGISTER=0
+# принимают апдейты этим сервером и в Telegram ничего не регистрируют.
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class TelegramWebhook(tornado.web.RequestHandler):
+    """POST от Telegram → Update в очередь приложения."""
+
+    def initialize(self, app, secret):
+        self.app = app
+        self.secret = secret
+
+    async def post(self):
+        if self.secret and not hmac.compare_digest(
+            self.request.headers.get(SECRET_HEADER, ""), self.secret
+        ):
+            self.set_status(403)
+            return
+
+        try:
+            update = Update.de_json(json.loads(self.request.body), self.app.bot)
+        except Exception as e:
+            print(f"[ERROR] webhook: не удалось разобрать апдейт: {e!r}")
+            self.set_status(400)
+            return
+
+        await self.app.update_queue.put(update)
+        self.set_status(200)
+
+
+async def serve_webhook(app, listen: str, port: int, url_path: str, secret=None):
+    """Запустить приложение и webhook-сервер без регистрации webhook; до Ctrl+C/SIGTERM."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: остаётся Ctrl+C
+
+    server = tornado.httpserver.HTTPServer(tornado.web.Application([
+        (rf"/{url_path.strip('/')}/?", TelegramWebhook, {"app": app, "secret": secret}),
+    ]))
+
+    async with app:
+        await app.start()
+        server.listen(port, address=listen)
+        try:
+            await stop.wait()
+        finally:
+            server.stop()
+            await app.stop()
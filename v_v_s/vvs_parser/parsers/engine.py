@@ -0,0 +1,434 @@
+import asyncio
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+import soupsieve
+from bs4 import BeautifulSoup
+
+from parsers.sites import SITES, Field, Site, get_site
+from utils.cache import get_cached, get_cached_entry, set_cached, set_cached_many
+from utils.matching import INDEX
+from utils.products import CATALOG
+from utils.records import ProductResult
+
+# Общий движок парсинга: работает по описаниям магазинов из parsers/sites.py.
+
+# Характеристики меняются редко — храним их в кеше неделю, цены — как обычно
+SPECS_LIFETIME = 7 * 24 * 3600
+
+# Режим браузера Playwright (для магазинов с fetch="playwright")
+HEADLESS = False
+
+# requests.Session на поток — переиспользуем соединения с магазином
+_local = threading.local()
+
+
+@lru_cache(maxsize=None)
+def compiled(css: str):
+    """Скомпилированный CSS-селектор (компиляция — один раз на процесс)."""
+    return soupsieve.compile(css)
+
+
+# Загрузка HTML
+
+def _fetch_requests(site: Site, url: str) -> Optional[str]:
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+
+    try:
+        resp = session.get(url, headers=site.headers, timeout=15)
+        resp.raise_for_status()
+        return resp.text
+    except Exception as e:
+        print(f"[ERROR] {site.title} загрузка: {e}")
+        return None
+
+
+def _fetch_playwright(site: Site, url: str) -> Optional[str]:
+    """Открывает страницу в Chromium (заголовки и ожидание — из описания магазина) и возвращает HTML."""
+    # Playwright импортируется только если он действительно нужен
+    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+
+    headers = dict(site.headers)
+    user_agent = headers.pop("User-Agent", None)
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=HEADLESS)
+        page = browser.new_page(
+            user_agent=user_agent,
+            extra_http_headers=headers or None,
+            viewport={"width": 1280, "height": 720},
+        )
+
+        try:
+            page.goto(url, wait_until="networkidle", timeout=60000)
+
+            # Ждём основную информацию товара, если магазин её указал
+            if site.wait_for:
+                try:
+                    page.wait_for_selector(site.wait_for, timeout=30000)
+                except PlaywrightTimeoutError:
+                    print(f"[WARN] {site.title}: не дождались {site.wait_for}, читаем HTML как есть")
+
+            return page.content()
+
+        except Exception as e:
+            print(f"[ERROR] {site.title} загрузка (Playwright): {e}")
+            return None
+
+        finally:
+            browser.close()
+
+
+FETCHERS = {
+    "requests": _fetch_requests,
+    "playwright": _fetch_playwright,
+}
+
+
+def fetch_html(site, url: str) -> Optional[str]:
+    """Загрузить страницу способом, указанным в описании магазина."""
+    site = get_site(site)
+    print(f"[INFO] {site.title} → {url}")
+    return FETCHERS[site.fetch](site, url)
+
+
+# Извлечение значений
+
+def extract_specs(site: Site, soup) -> Dict[str, str]:
+    """Таблица характеристик товара: {название: значение}."""
+    specs = {}
+    if not site.specs:
+        return specs
+
+    for row in compiled(site.specs.row).select(soup):
+        key_el = compiled(site.specs.key).select_one(row)
+        val_el = compiled(site.specs.value).select_one(row)
+        if not key_el or not val_el:
+            continue
+        specs[key_el.get_text(strip=True)] = val_el.get_text(" ", strip=True)
+
+    return specs
+
+
+def _field_value(f: Field, html, soup, specs: Dict[str, str], name: Optional[str]):
+    if f.extract:
+        value = f.extract(html, soup)
+    elif f.from_name:
+        value = name or ""
+    elif f.spec:
+        value = specs.get(f.spec)
+    else:
+        el = compiled(f.css).select_one(soup)
+        if el is None:
+            return None
+        if f.attr:
+            value = el.get(f.attr)
+        else:
+            if f.exclude:
+                # Копия элемента без исключённых потомков — исходная страница не меняется
+                el = copy.copy(el)
+                for skip in compiled(f.exclude).select(el):
+                    skip.decompose()
+            value = el.get_text(f.sep, strip=True)
+
+    return f.normalize(value) if f.normalize else value
+
+
+def first_value(fields, html=None, soup=None, specs=None, name=None):
+    """Первое непустое значение из списка альтернатив."""
+    for f in fields:
+        value = _field_value(f, html, soup, specs or {}, name)
+        if value:
+            return value
+    return None
+
+
+def _page_fields(site: Site) -> List[str]:
+    """Поля, которые есть только на странице товара (не выводятся из названия)."""
+    return [k for k, alts in site.fields.items() if not all(f.from_name for f in alts)]
+
+
+def _result(site: Site, url: str, name, price, page_values: Dict) -> ProductResult:
+    values = {}
+    for key, alts in site.fields.items():
+        if key in page_values:
+            values[key] = page_values[key]
+        else:
+            values[key] = first_value(alts, name=name)
+    return ProductResult(site=site.title, url=url, name=name, price=price, **values)
+
+
+def _error(site: Site, url: str, name, err: str) -> ProductResult:
+    return ProductResult(site=site.title, url=url, name=name, error=err)
+
+
+# Парсинг товара
+
+def parse_html(site, url: str, html: str, name: Optional[str] = None,
+               cache_specs: bool = True) -> ProductResult:
+    """
+    Разобрать уже загруженную страницу товара.
+    cache_specs=False — характеристики не пишутся в кеш (листинг пишет их пачкой).
+    """
+    site = get_site(site)
+    soup = BeautifulSoup(html, site.parser)
+    specs = extract_specs(site, soup)
+
+    if site.name:
+        name = first_value(site.name, html, soup, specs)
+
+    price = first_value(site.price, html, soup, specs, name)
+    if not price and site.price_required:
+        return _error(site, url, name, "Price not found")
+
+    page_values = {
+        key: first_value(site.fields[key], html, soup, specs, name)
+        for key in _page_fields(site)
+    }
+
+    # Характеристики отдельно — их переиспользует режим листинга
+    if page_values and cache_specs:
+        set_cached(f"{site.cache_ns}_SPECS::{url}", page_values)
+
+    return _result(site, url, name, price, page_values)
+
+
+def _from_listing(site: Site, url: str, name: Optional[str]) -> Optional[Tuple[ProductResult, float]]:
+    """
+    Собрать результат из кеша листинга, если страница товара не нужна.
+    Возвращает (результат, время листинга) — цена не свежее листинга.
+    """
+    entry = get_cached_entry(f"{site.cache_ns}_LIST::{url}")
+    if not entry or not entry[1] or not entry[1].get("price"):
+        return None
+    ts, listed = entry
+
+    page_values = {}
+    if _page_fields(site):
+        page_values = get_cached(f"{site.cache_ns}_SPECS::{url}", lifetime=SPECS_LIFETIME)
+        if page_values is None:
+            return None
+
+    return _result(site, url, name or listed["name"], listed["price"], page_values), ts
+
+
+def parse_product(site, url: str, name: Optional[str] = None, fresh: bool = False) -> ProductResult:
+    """
+    Спарсить один товар магазина (с кешем).
+    fresh=True — не смотреть в кеш, а загрузить страницу заново (обновление цены).
+    """
+    site = get_site(site)
+    cache_key = site.cache_key(url, name)
+
+    # В индекс — со временем записи кеша, иначе старая цена выглядела бы свежей
+    if not fresh:
+        entry = get_cached_entry(cache_key)
+        if entry and entry[1]:
+            ts, cached = entry
+            INDEX.add(cached, ts)
+            return cached
+
+    # Цена уже известна из листинга каталога — страницу товара не грузим
+    listed = None if fresh else _from_listing(site, url, name)
+
+    ts = None
+    if listed is not None:
+        result, ts = listed
+    else:
+        html = fetch_html(site, url)
+        if html:
+            result = parse_html(site, url, html, name)
+        else:
+            result = _error(site, url, name, "HTML not loaded")
+
+    # Обновление цены не удалось, а прежняя ещё действует — не затираем её ошибкой
+    # (воркер просто отметит задачу неудачной и повторит позже)
+    if fresh and result.error:
+        previous = get_cached(cache_key)
+        if previous is not None and not previous.error:
+            return result
+
+    set_cached(cache_key, result, ts)
+    # Индекс «где дешевле» обновляется по мере прихода результатов
+    INDEX.add(result, ts)
+    return result
+
+
+def parse_site(site, products: List[Dict]) -> List[ProductResult]:
+    """Спарсить список товаров [{"url", "name"}] одного магазина параллельно."""
+    site = get_site(site)
+    if not products:
+        return []
+
+    with ThreadPoolExecutor(max_workers=site.concurrency) as pool:
+        return list(pool.map(lambda p: parse_product(site, p["url"], p.get("name")), products))
+
+
+# Парсинг категорий (листингов)
+
+def _fetch_page_values(site: Site, url: str) -> Optional[Dict]:
+    """Характеристики со страницы товара (в кеш не пишет); None — страница не загрузилась."""
+    html = fetch_html(site, url)
+    if not html:
+        return None
+
+    result = parse_html(site, url, html, cache_specs=False)
+    return {key: getattr(result, key) for key in _page_fields(site)}
+
+
+def _listing_specs(site: Site, urls: List[str], entries: Dict) -> Dict[str, Dict]:
+    """
+    Характеристики для товаров листинга: из кеша, а недостающие — параллельно
+    (site.concurrency потоков). Новые записи _SPECS кладутся в entries,
+    чтобы записать кеш один раз вместе с листингом.
+    Ссылок, чьи страницы не загрузились, в результате нет.
+    """
+    specs = {}
+    missing = []
+    for url in urls:
+        cached = get_cached(f"{site.cache_ns}_SPECS::{url}", lifetime=SPECS_LIFETIME)
+        if cached is None:
+            missing.append(url)
+        else:
+            specs[url] = cached
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=site.concurrency) as pool:
+            fetched = pool.map(lambda u: _fetch_page_values(site, u), missing)
+            for url, values in zip(missing, fetched):
+                if values is not None:
+                    specs[url] = values
+                    entries[f"{site.cache_ns}_SPECS::{url}"] = values
+
+    return specs
+
+
+def _next_page_url(listing, soup, page_url: str) -> Optional[str]:
+    """Ссылка на следующую страницу категории (или None, если это последняя)."""
+    for css in listing.next_page:
+        link = compiled(css).select_one(soup)
+        if link and link.get("href"):
+            return urljoin(page_url, link["href"])
+    return None
+
+
+def parse_catalog(site, category_url: str, max_pages: int = 20, with_specs: bool = True) -> List[ProductResult]:
+    """
+    Парсит категорию постранично: название, ссылка и цена — прямо из плиток,
+    один запрос на страницу листинга. Страница товара загружается только ради
+    полей, которых нет в листинге (и эти поля кешируются надолго).
+    """
+    site = get_site(site)
+    listing = site.listing
+    if listing is None:
+        raise ValueError(f"У магазина {site.title} нет режима листинга")
+
+    page_fields = _page_fields(site)
+    listed = []
+    seen = set()
+    page_url = category_url
+
+    for _ in range(max_pages):
+        html = fetch_html(site, page_url)
+        if not html:
+            break
+
+        soup = BeautifulSoup(html, site.parser)
+
+        tiles = []
+        for css in listing.tiles:
+            tiles = compiled(css).select(soup)
+            if tiles:
+                break
+
+        new = 0
+        for tile in tiles:
+            link = compiled(listing.link).select_one(tile)
+            if not link or not link.get("href"):
+                continue
+
+            url = urljoin(page_url, link["href"])
+            if url in seen:
+                continue
+            seen.add(url)
+            new += 1
+
+            listed.append((url, first_value(listing.name, soup=tile), first_value(listing.price, soup=tile)))
+
+        # Пустая страница или повтор предыдущей — дальше листать нечего
+        if not new:
+            break
+
+        page_url = _next_page_url(listing, soup, page_url)
+        if not page_url:
+            break
+
+    # Страницы товаров — только ради полей, которых нет в листинге
+    entries = {}
+    specs = {}
+    if page_fields and with_specs:
+        specs = _listing_specs(site, [url for url, _, _ in listed], entries)
+
+    results = [_result(site, url, name, price, specs.get(url, {})) for url, name, price in listed]
+
+    # Наполняем кеш (одна запись): цены листинга подхватит parse_product по ссылке.
+    # Без характеристик (не запрашивали или страница не загрузилась) запись
+    # неполная — в кеш товаров её не кладём, parse_product догрузит страницу.
+    for item in results:
+        if not item.price:
+            continue
+        entries[f"{site.cache_ns}_LIST::{item.url}"] = {"name": item.name, "price": item.price}
+        if site.name and (item.url in specs or not page_fields):
+            entries[site.cache_key(item.url)] = item
+    set_cached_many(entries)
+
+    for item in results:
+        INDEX.add(item)
+
+    return results
+
+
+# Все товары магазина: ссылки из products.json + категории ("<site>_catalog")
+
+def collect(site, products: Optional[Dict] = None) -> List[ProductResult]:
+    """
+    Товары магазина по конфигу: прямые ссылки и листинги категорий без повторов.
+    products — конфиг в формате products.json; по умолчанию — CATALOG (уже в памяти).
+    """
+    site = get_site(site)
+    if products is None:
+        direct = CATALOG.for_site(site.key)
+        catalogs = CATALOG.for_site(f"{site.key}_catalog")
+    else:
+        direct = products.get(site.key, [])
+        catalogs = products.get(f"{site.key}_catalog", [])
+
+    items = parse_site(site, direct)
+
+    seen = {x.url for x in items}
+    for c in catalogs:
+        for item in parse_catalog(site, c["url"], c.get("pages", 20)):
+            if item.url not in seen:
+                seen.add(item.url)
+                items.append(item)
+
+    return items
+
+
+async def collect_async(site, products: Optional[Dict] = None) -> List[ProductResult]:
+    """Асинхронная обёртка — синхронный парсинг уходит в отдельный поток."""
+    return await asyncio.to_thread(collect, site, products)
+
+
+async def collect_all_async(products: Optional[Dict] = None) -> Dict[str, List[ProductResult]]:
+    """Все магазины параллельно: {ключ магазина: товары}."""
+    keys = list(SITES)
+    results = await asyncio.gather(*(collect_async(k, products) for k in keys))
+    return dict(zip(keys, results))
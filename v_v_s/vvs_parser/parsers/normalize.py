@@ -0,0 +1,113 @@
+import re
+from typing import Optional
+
+# Нормализаторы полей товара.
+# Модуль лёгкий (только re), поэтому на него можно ссылаться из реестра
+# сайтов, не подтягивая при старте requests/BeautifulSoup/Playwright.
+
+
+def price_int(v: Optional[str]) -> Optional[int]:
+    """Цена вида '54 990' → 54990; всё, что не число, — None."""
+    if not v:
+        return None
+    v = v.strip().replace(" ", "")
+    return int(v) if v.isdigit() else None
+
+
+# Правдоподобные границы цены в рублях для листингов (не даём склеенным числам
+# вроде «59 990 49 990» → 5999049990 попасть в кеш и /cheapest)
+PRICE_MIN = 100
+PRICE_MAX = 5_000_000
+
+# Первое число с разделителями разрядов (пробел, неразрывный, узкий)
+_PRICE_RE = re.compile(r"\d(?:[\d\s\xa0\u2009\u202f]*\d)?")
+
+
+def price_from_text(text: Optional[str]) -> Optional[int]:
+    """
+    Достаёт первое число из текста цены («54 990 ₽» → 54990, «49990.00» → 49990).
+    Вне PRICE_MIN..PRICE_MAX — None.
+    """
+    if not text:
+        return None
+    m = _PRICE_RE.search(text)
+    if not m:
+        return None
+    value = int(re.sub(r"\D", "", m.group()))
+    return value if PRICE_MIN <= value <= PRICE_MAX else None
+
+
+def price_in_range(text) -> Optional[int]:
+    """Выделяет число из строки (убирает пробелы/символы и валидирует диапазон)."""
+    if not text:
+        return None
+
+    cleaned = (
+        str(text)
+        .replace(" ", "")
+        .replace(",", "")
+        .replace("\xa0", "")
+        .replace("\u2009", "")
+    )
+
+    cleaned = re.sub(r"[^\d]", "", cleaned)
+
+    if cleaned.isdigit():
+        price = int(cleaned)
+        return price if 50_000 <= price <= 500_000 else None
+
+    return None
+
+
+# Нормализуем поле "Объём видеопамяти" (берём первые 2 слова)
+def normalize_memory(v: Optional[str]) -> Optional[str]:
+    if not v:
+        return None
+    v = v.split(" смотреть")[0]
+    parts = v.split()
+    return " ".join(parts[:2]) if len(parts) >= 2 else v
+
+
+# Нормализуем поле "Тип видеопамяти"
+def normalize_memory_type(v: Optional[str]) -> Optional[str]:
+    if not v:
+        return None
+    v = v.split(" смотреть")[0]
+    return v.split()[0]
+
+
+def extract_memory_from_title(title: str) -> Optional[str]:
+    """Извлекает объём памяти (например 128GB) из заголовка товара."""
+    m = re.search(r"(\d+\s*(?:GB|ГБ|Gb|гб))", title or "", re.IGNORECASE)
+    return m.group(1) if m else None
+
+
+def extract_color_from_title(title: str) -> Optional[str]:
+    """Определяет цвет устройства по известным ключевым словам."""
+    colors = [
+        "Black", "White", "Blue", "Pink", "Green", "Yellow",
+        "Silver", "Space Gray", "Natural", "Titanium",
+        "Черный", "Чёрный", "Белый", "Синий", "Ultramarine",
+        "Deep Blue",
+    ]
+    low = (title or "").lower()
+    for c in colors:
+        if c.lower() in low:
+            return c
+    return None
+
+
+def guess_color(name: str) -> Optional[str]:
+    """Определяет цвет по ключевым словам в названии (вариант Vernik)."""
+    name_l = (name or "").lower()
+    colors = ["black", "white", "blue", "silver", "gold", "green", "red", "gray"]
+    for c in colors:
+        if c in name_l:
+            return c.capitalize()
+    return None
+
+
+def guess_memory(name: str) -> Optional[str]:
+    """Извлекает объём памяти вида '128gb' (вариант Vernik)."""
+    m = re.search(r"(\d+gb)", (name or "").lower())
+    return m.group(1).upper() if m else None
@@ -0,0 +1,30 @@
+import importlib
+from typing import Callable, Dict
+
+# Реестр парсеров: имя → "модуль:функция".
+# Сами магазины описаны в parsers/sites.py, здесь — точки входа общего движка.
+# Модули парсеров тянут Playwright, BeautifulSoup, lxml и requests,
+# поэтому импортируем их только при первом обращении, а не при старте бота.
+PARSERS: Dict[str, str] = {
+    "collect_async": "parsers.engine:collect_async",
+    "collect_all_async": "parsers.engine:collect_all_async",
+    "parse_product": "parsers.engine:parse_product",
+}
+
+# Уже загруженные функции
+_loaded: Dict[str, Callable] = {}
+
+
+def get_parser(name: str) -> Callable:
+    """Вернуть функцию парсера по имени, импортировав модуль при первом вызове."""
+    func = _loaded.get(name)
+    if func is not None:
+        return func
+
+    if name not in PARSERS:
+        raise KeyError(f"Неизвестный парсер: {name}")
+
+    module_name, func_name = PARSERS[name].split(":")
+    func = getattr(importlib.import_module(module_name), func_name)
+    _loaded[name] = func
+    return func
@@ -0,0 +1,206 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from parsers.normalize import (
+    price_int,
+    price_from_text,
+    price_in_range,
+    normalize_memory,
+    normalize_memory_type,
+    extract_memory_from_title,
+    extract_color_from_title,
+    guess_color,
+    guess_memory,
+)
+
+# Реестр магазинов: каждый сайт описан здесь один раз.
+# Загрузка, разбор страниц, кеш и Telegram-команды строятся по этим описаниям
+# (см. parsers/engine.py и bot/handlers.py) — новый магазин = новая запись в SITES.
+
+# Заголовки браузера по умолчанию
+BROWSER_UA = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120 Safari/537.36"
+)
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    Как получить одно значение со страницы.
+    Источник — ровно один из: css (+attr), spec, from_name, extract.
+    """
+    css: Optional[str] = None            # CSS-селектор (компилируется один раз на процесс)
+    attr: Optional[str] = None           # атрибут элемента; без него берётся текст
+    sep: str = ""                        # разделитель при склейке текста элемента
+    exclude: Optional[str] = None        # потомки, чей текст не берём (старая цена и т.п.)
+    spec: Optional[str] = None           # название строки в таблице характеристик
+    from_name: bool = False              # значение вычисляется из названия товара
+    extract: Optional[Callable] = None   # своя функция (html, soup) → значение
+    normalize: Optional[Callable] = None
+
+
+@dataclass(frozen=True)
+class Specs:
+    """Таблица характеристик: строка, ячейка-название и ячейка-значение."""
+    row: str
+    key: str
+    value: str
+
+
+@dataclass(frozen=True)
+class Listing:
+    """Страница категории: плитки товаров и пагинация."""
+    tiles: Tuple[str, ...]               # селекторы плитки (берётся первый сработавший)
+    link: str                            # ссылка на товар внутри плитки
+    name: Tuple[Field, ...]
+    price: Tuple[Field, ...]
+    next_page: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Site:
+    key: str                             # имя команды и ключ в products.json
+    title: str                           # значение поля "site" в результате
+    button: str                          # подпись inline-кнопки
+    icon: str                            # значок в карточке товара
+    about: str                           # строка в приветствии
+    fetch: str                           # способ загрузки: "requests" или "playwright"
+    cache_ns: str                        # пространство имён в кеше
+    price: Tuple[Field, ...]
+    name: Tuple[Field, ...] = ()         # пусто — название берётся из products.json
+    fields: Dict[str, Tuple[Field, ...]] = field(default_factory=dict)
+    specs: Optional[Specs] = None
+    listing: Optional[Listing] = None
+    parser: str = "html.parser"          # парсер BeautifulSoup
+    headers: Dict[str, str] = field(default_factory=lambda: {"User-Agent": BROWSER_UA})
+    price_required: bool = False         # без цены результат считается ошибкой
+    concurrency: int = 4                 # сколько товаров грузить параллельно
+    wait_for: Optional[str] = None       # (playwright) чего дождаться на странице перед чтением HTML
+
+    def cache_key(self, url: str, name: Optional[str] = None) -> str:
+        # Если название задаётся в конфиге, оно входит в ключ кеша
+        if not self.name:
+            return f"{self.cache_ns}::{url}::{name}"
+        return f"{self.cache_ns}::{url}"
+
+
+# Цена Vernik ищется цепочкой эвристик (см. VernikSimpleParser)
+def _vernik_price(html, soup):
+    from parsers.vernik import VernikSimpleParser
+    return VernikSimpleParser().find_price(html, soup)
+
+
+SITES: Dict[str, Site] = {
+    "quke": Site(
+        key="quke",
+        title="Quke",
+        button="🔵 QUKE",
+        icon="📱",
+        about="Quke.ru (Playwright)",
+        fetch="playwright",
+        cache_ns="QUKE",
+        name=(Field("h1"),),
+        price=(
+            Field("a[data-price]", attr="data-price", normalize=price_int),
+            Field("span.val", normalize=price_int),
+        ),
+        fields={
+            "memory": (Field(from_name=True, normalize=extract_memory_from_title),),
+            "color": (Field(from_name=True, normalize=extract_color_from_title),),
+        },
+        # Каждый товар — отдельный Chromium, поэтому по одному
+        concurrency=1,
+        wait_for="h1, span.val",
+    ),
+    "kns": Site(
+        key="kns",
+        title="KNS",
+        button="🟣 KNS",
+        icon="🟣",
+        about="KNS.ru (Requests + BS4)",
+        fetch="requests",
+        cache_ns="KNS",
+        parser="lxml",
+        name=(Field("h1"),),
+        price=(Field("meta[itemprop=price]", attr="content", normalize=price_int),),
+        specs=Specs(
+            row="div.row.no-gutters.my-2.align-items-end",
+            key="div.field-ex-name",
+            value="div[data-id]",
+        ),
+        fields={
+            "memory": (Field(spec="Объем видеопамяти", normalize=normalize_memory),),
+            "memory_type": (Field(spec="Тип видеопамяти", normalize=normalize_memory_type),),
+        },
+        listing=Listing(
+            tiles=(
+                "div.catalog-item",
+                "div.product-item",
+                "div.item-block",
+                "[itemtype$='schema.org/Product']",
+            ),
+            link="a[href*='/product/']",
+            name=(
+                Field("[itemprop=name]", attr="content"),
+                Field("[itemprop=name]", sep=" "),
+                Field("a[href*='/product/']", sep=" "),
+            ),
+            price=(
+                Field("meta[itemprop=price]", attr="content", normalize=price_from_text),
+                # Зачёркнутая старая цена внутри блока цены не учитывается
+                Field(".price, .item-price, .product-price", exclude="s, del, .old-price, .price-old",
+                      normalize=price_from_text),
+            ),
+            next_page=(
+                "a[rel=next]",
+                ".pagination a.next",
+                ".pagination li.next a",
+                "a.pagination-next",
+            ),
+        ),
+    ),
+    "vernik": Site(
+        key="vernik",
+        title="Vernik",
+        button="🟡 VERNIK",
+        icon="🟡",
+        about="Vernik.me",
+        fetch="requests",
+        cache_ns="VERNIK",
+        headers={
+            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        },
+        price=(Field(extract=_vernik_price),),
+        fields={
+            "memory": (Field(from_name=True, normalize=guess_memory),),
+            "color": (Field(from_name=True, normalize=guess_color),),
+        },
+        price_required=True,
+        listing=Listing(
+            tiles=(".product-item", ".catalog-item", ".product-card", ".products .item"),
+            link="a[href*='/catalog/']",
+            name=(
+                Field("[itemprop=name]", attr="content"),
+                Field("[itemprop=name], .product-item-title, .name, .title", sep=" "),
+                Field("a[href*='/catalog/']", sep=" "),
+            ),
+            price=(
+                Field("meta[itemprop=price]", attr="content", normalize=price_in_range),
+                Field(".product-price, .price, .current-price, .price__value", normalize=price_in_range),
+            ),
+            next_page=("a[rel=next]", ".pagination a.next", ".modern-page-next", ".bx-pag-next a"),
+        ),
+    ),
+}
+
+
+def get_site(site) -> Site:
+    """Site по ключу ("kns") или сам объект Site."""
+    if isinstance(site, Site):
+        return site
+    if site not in SITES:
+        raise KeyError(f"Неизвестный магазин: {site}")
+    return SITES[site]
@@ -1,6 +1,19 @@
 import json
+import os
+import sqlite3
+import threading
 import time
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.records import ProductResult, SCHEMA_VERSION
+
+# Кеш результатов парсинга в SQLite: одна строка на ключ.
+# Запись — upsert одной строки, чтение — поиск по первичному ключу,
+# поэтому воркеры в разных процессах пишут параллельно, не переписывая
+# весь кеш и не перечитывая его после чужих записей.
+# WAL: читатели не ждут писателя. WAL не работает на сетевых ФС —
+# бот и воркеры должны работать на одной машине.
 
 # Определяем корневую директорию проекта
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -8,62 +21,238 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Папка для кеша
 CACHE_DIR = BASE_DIR / "cache"
 
-# Файл кеша
-CACHE_FILE = CACHE_DIR / "cache.json"
+# База кеша (отдельно от очереди — запись результатов не ждёт выдачу задач)
+CACHE_FILE = CACHE_DIR / "cache.sqlite"
+
+# Старый кеш в JSON — переносится в базу при первом запуске
+LEGACY_FILE = CACHE_DIR / "cache.json"
+
+# Тип значения: ProductResult (ProductResult.pack) или произвольный JSON (характеристики, листинги)
+TAG_RECORD = 0
+TAG_JSON = 1
+
+# Время жизни цены в кеше по умолчанию, секунд
+LIFETIME = 600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key   TEXT    PRIMARY KEY,
+    ts    REAL    NOT NULL,
+    tag   INTEGER NOT NULL,
+    value BLOB    NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_ts ON cache (tag, ts);
+"""
+
+UPSERT = """
+INSERT INTO cache (key, ts, tag, value) VALUES (?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET ts = excluded.ts, tag = excluded.tag, value = excluded.value
+"""
+
+# Соединение на поток (и на процесс — после fork соединение родителя не используем)
+_local = threading.local()
 
-# Создаём папку cache, если её нет
-CACHE_DIR.mkdir(exist_ok=True)
+# Инициализирован ли кеш (папка создаётся не при импорте, а в init_cache)
+_initialized = False
+_init_lock = threading.Lock()
 
 
-def load_cache() -> dict:
-    """Загрузить cache.json (или вернуть пустой словарь, если файла нет)."""
-    if CACHE_FILE.exists():
+def init_cache(cache_dir=None) -> None:
+    """
+    Подготовить кеш: выбрать папку (по умолчанию <проект>/cache), создать её и базу.
+    Вызывается явно при старте бота и воркеров; если забыли — выполнится при первом обращении.
+    """
+    global CACHE_DIR, CACHE_FILE, LEGACY_FILE, _initialized
+
+    with _init_lock:
+        if cache_dir is not None:
+            CACHE_DIR = Path(cache_dir)
+            CACHE_FILE = CACHE_DIR / "cache.sqlite"
+            LEGACY_FILE = CACHE_DIR / "cache.json"
+
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _initialized = True
+
+        db = _connect()
+        db.executescript(SCHEMA)
+
+        # Проверка версии и перенос старого кеша — под блокировкой на запись:
+        # бот и воркеры стартуют одновременно, делает это только первый
+        db.execute("BEGIN IMMEDIATE")
         try:
-            with open(CACHE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return {}  # если файл повреждён
-    return {}
+            _check_schema(db)
+            if LEGACY_FILE.exists():
+                _migrate_json_cache(db)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
 
 
-def save_cache(data: dict) -> None:
-    """Сохранить словарь в cache.json."""
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def _check_schema(db: sqlite3.Connection) -> None:
+    """
+    Версия упаковки ProductResult хранится в PRAGMA user_version.
+    Записи другой версии не распаковать — удаляем их (это кеш, соберётся заново).
+    """
+    (version,) = db.execute("PRAGMA user_version").fetchone()
+    if version == SCHEMA_VERSION:
+        return
+
+    dropped = db.execute("DELETE FROM cache WHERE tag = ?", (TAG_RECORD,)).rowcount
+    db.execute(f"PRAGMA user_version = {int(SCHEMA_VERSION)}")
+    if dropped:
+        print(f"[INFO] Кеш: схема ProductResult {version} → {SCHEMA_VERSION}, удалено записей: {dropped}")
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid() and _local.path == CACHE_FILE:
+        return conn
+
+    conn = sqlite3.connect(CACHE_FILE, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _local.conn, _local.pid, _local.path = conn, os.getpid(), CACHE_FILE
+    return conn
+
+
+def _db() -> sqlite3.Connection:
+    if not _initialized:
+        init_cache()
+    return _connect()
 
 
-def get_cached(url: str, lifetime: int = 600):
+# Значения: ProductResult — в бинарной упаковке, остальное — JSON
+
+def encode(data) -> Tuple[int, bytes]:
+    if isinstance(data, ProductResult):
+        return TAG_RECORD, data.pack()
+    return TAG_JSON, json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def decode(tag: int, value: bytes):
+    if tag == TAG_RECORD:
+        return ProductResult.unpack(value)[0]
+    return json.loads(value)
+
+
+def get_cached_entry(url: str, lifetime: int = LIFETIME):
     """
-    Вернуть кешированный объект,
-    если он существует и ещё не устарел.
-    lifetime — время жизни кеша в секундах (по умолчанию 10 минут).
+    Как get_cached, но вместе со временем записи: (timestamp, данные) или None.
+    Нужен, когда важен возраст значения (индекс «где дешевле» отсекает устаревшие цены).
     """
-    cache = load_cache()
-    item = cache.get(url)
+    row = _db().execute("SELECT ts, tag, value FROM cache WHERE key = ?", (url,)).fetchone()
 
     # Нет записи → нет кеша
-    if not item:
+    if row is None:
         return None
 
-    ts = item.get("timestamp")
-    if not ts:
-        return None
+    ts, tag, value = row
 
     # Проверяем, не устарел ли кеш
     if time.time() - ts > lifetime:
         return None
 
-    return item.get("data")
+    return ts, decode(tag, value)
+
+
+def get_cached(url: str, lifetime: int = LIFETIME):
+    """
+    Вернуть кешированный объект,
+    если он существует и ещё не устарел.
+    lifetime — время жизни кеша в секундах (по умолчанию 10 минут).
+    """
+    entry = get_cached_entry(url, lifetime)
+    return entry[1] if entry else None
+
+
+def set_cached(url: str, data, ts: Optional[float] = None):
+    """Записать значение в кеш (с timestamp; ts — время получения данных, по умолчанию сейчас)."""
+    _db().execute(UPSERT, (url, ts or time.time(), *encode(data)))
+
+
+def set_cached_many(items: dict):
+    """
+    Записать сразу несколько значений в кеш {ключ: данные}.
+    Одна транзакция — удобно для листингов каталога,
+    где за проход получаем десятки товаров.
+    """
+    if not items:
+        return
+
+    now = time.time()
+    rows = [(key, now, *encode(data)) for key, data in items.items()]
+
+    db = _db()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.executemany(UPSERT, rows)
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+
+def delete_cached(keys: Iterable[str]) -> int:
+    """Удалить записи из кеша (например, товары, убранные из products.json). Возвращает число удалённых."""
+    keys = [(key,) for key in keys]
+    if not keys:
+        return 0
+
+    db = _db()
+    before = db.total_changes
+    db.executemany("DELETE FROM cache WHERE key = ?", keys)
+    return db.total_changes - before
+
 
+def load_cache() -> Dict[str, tuple]:
+    """Весь кеш {ключ: (timestamp, данные)} — для отладки и миграций; бот и воркеры читают по ключу."""
+    rows = _db().execute("SELECT key, ts, tag, value FROM cache").fetchall()
+    return {key: (ts, decode(tag, value)) for key, ts, tag, value in rows}
+
+
+def cached_results_since(since: float) -> List[Tuple[float, ProductResult]]:
+    """Результаты товаров, записанные позже since: [(timestamp, ProductResult)] по возрастанию времени."""
+    rows = _db().execute(
+        "SELECT ts, value FROM cache WHERE tag = ? AND ts > ? ORDER BY ts",
+        (TAG_RECORD, since),
+    ).fetchall()
+    return [(ts, ProductResult.unpack(value)[0]) for ts, value in rows]
+
+
+# Перенос старого cache.json
+
+def _migrate_json_cache(db: sqlite3.Connection) -> int:
+    """
+    Перенести старый cache.json в базу: результаты товаров становятся
+    ProductResult, остальное хранится как JSON. Старый файл → cache.json.bak.
+    Вызывается внутри транзакции init_cache. Возвращает число перенесённых записей.
+    """
+    try:
+        with open(LEGACY_FILE, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+    except FileNotFoundError:
+        return 0  # уже перенёс другой процесс
+    except Exception:
+        legacy = {}  # если файл повреждён — начинаем с пустого кеша
 
-def set_cached(url: str, data: dict):
-    """Записать значение в кеш (с timestamp)."""
-    cache = load_cache()
+    rows = []
+    for key, item in legacy.items():
+        if not isinstance(item, dict) or not item.get("timestamp"):
+            continue
+        data = item.get("data")
+        if isinstance(data, dict) and data.get("site") and data.get("url"):
+            data = ProductResult.from_dict(data)
+        rows.append((key, item["timestamp"], *encode(data)))
 
-    cache[url] = {
-        "timestamp": time.time(),  # время записи в кеш
-        "data": data               # сами данные
-    }
+    # Более свежие записи в базе не затираем
+    db.executemany(UPSERT + " WHERE excluded.ts > cache.ts", rows)
 
-    save_cache(cache)
+    try:
+        LEGACY_FILE.replace(LEGACY_FILE.with_name(LEGACY_FILE.name + ".bak"))
+    except FileNotFoundError:
+        return 0  # другой процесс успел раньше
 
+    print(f"[INFO] Кеш перенесён из {LEGACY_FILE.name} в {CACHE_FILE.name}: {len(rows)} записей")
+    return len(rows)
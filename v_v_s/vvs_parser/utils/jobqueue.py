@@ -0,0 +1,171 @@
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+# Очередь задач парсинга в SQLite — общая для нескольких процессов-воркеров.
+# Воркер забирает задачу с арендой (lease) на ограниченное время; если он упал
+# и не отчитался, аренда истекает и задачу забирает другой воркер.
+# Гарантия — «хотя бы один раз»: задачу может выполнить повторно только тот,
+# кто забрал её после истечения аренды.
+# Режим WAL — процессы одной машины: на сетевых файловых системах WAL не работает.
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Файл очереди (рядом с кешем)
+QUEUE_FILE = BASE_DIR / "cache" / "jobs.sqlite"
+
+# Аренда по умолчанию: Quke через Playwright может грузиться до ~1.5 минут
+LEASE_SECONDS = 180
+
+# После стольких неудачных попыток задача помечается failed
+MAX_ATTEMPTS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    site        TEXT    NOT NULL,
+    url         TEXT    NOT NULL,
+    name        TEXT    NOT NULL DEFAULT '',
+    status      TEXT    NOT NULL DEFAULT 'pending',  -- pending | leased | done | failed
+    worker      TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    updated     REAL    NOT NULL,
+    UNIQUE (site, url, name)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, lease_until);
+"""
+
+
+class JobQueue:
+    def __init__(self, path=None, lease_seconds: int = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS):
+        self.path = Path(path) if path else QUEUE_FILE
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # isolation_level=None — транзакции открываем сами (BEGIN IMMEDIATE)
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA busy_timeout=30000")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def enqueue(self, site: str, url: str, name: Optional[str] = None) -> bool:
+        """
+        Поставить задачу. Уже ждущая или выполняемая задача не дублируется,
+        завершённая (done/failed) снова становится pending — это обновление цены.
+        """
+        cur = self.db.execute(
+            """
+            INSERT INTO jobs (site, url, name, updated) VALUES (?, ?, ?, ?)
+            ON CONFLICT (site, url, name) DO UPDATE
+                SET status = 'pending', worker = NULL, lease_until = NULL,
+                    attempts = 0, error = NULL, updated = excluded.updated
+                WHERE status IN ('done', 'failed')
+            """,
+            (site, url, name or "", time.time()),
+        )
+        return cur.rowcount > 0
+
+    def enqueue_products(self, products: Dict) -> int:
+        """Поставить в очередь все товары из products.json. Возвращает число новых задач."""
+        from parsers.sites import SITES
+
+        added = 0
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            for key in SITES:
+                for p in products.get(key, []):
+                    added += self.enqueue(key, p["url"], p.get("name"))
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        return added
+
+    def remove(self, site: str, url: str, name: Optional[str] = None) -> bool:
+        """Убрать задачу товара, которого больше нет в products.json (выполняемую не трогаем)."""
+        cur = self.db.execute(
+            "DELETE FROM jobs WHERE site = ? AND url = ? AND name = ? AND status != 'leased'",
+            (site, url, name or ""),
+        )
+        return cur.rowcount > 0
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """
+        Забрать одну задачу: ждущую или с истёкшей арендой.
+        BEGIN IMMEDIATE берёт блокировку на запись — два воркера не получат одну задачу.
+        """
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.db.execute(
+                """
+                SELECT * FROM jobs
+                WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?)
+                ORDER BY id LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+
+            if row is None:
+                self.db.execute("COMMIT")
+                return None
+
+            # Задача, которую уже много раз брали и не довели до конца
+            if row["attempts"] >= self.max_attempts:
+                self.db.execute(
+                    "UPDATE jobs SET status = 'failed', worker = NULL, lease_until = NULL, "
+                    "error = COALESCE(error, 'lease expired'), updated = ? WHERE id = ?",
+                    (now, row["id"]),
+                )
+                self.db.execute("COMMIT")
+                return self.claim(worker)
+
+            self.db.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, "
+                "attempts = attempts + 1, updated = ? WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row["id"]),
+            )
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+
+        job = dict(row)
+        job["attempts"] += 1
+        return job
+
+    def complete(self, job_id: int, worker: str) -> bool:
+        """Отметить задачу выполненной (только если аренда всё ещё у этого воркера)."""
+        cur = self.db.execute(
+            "UPDATE jobs SET status = 'done', lease_until = NULL, error = NULL, updated = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (time.time(), job_id, worker),
+        )
+        return cur.rowcount > 0
+
+    def fail(self, job_id: int, worker: str, error: str) -> bool:
+        """Неудачная попытка: задача вернётся в очередь или станет failed."""
+        cur = self.db.execute(
+            """
+            UPDATE jobs
+            SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                worker = NULL, lease_until = NULL, error = ?, updated = ?
+            WHERE id = ? AND worker = ? AND status = 'leased'
+            """,
+            (self.max_attempts, error, time.time(), job_id, worker),
+        )
+        return cur.rowcount > 0
+
+    def stats(self) -> Dict[str, int]:
+        """Сколько задач в каждом статусе."""
+        rows = self.db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
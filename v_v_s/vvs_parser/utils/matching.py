@@ -0,0 +1,228 @@
+import bisect
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.cache import LIFETIME, cached_results_since
+from utils.records import ProductResult
+
+# Сопоставление товаров между магазинами.
+# Из названия (и полей memory/color) строится нормализованный ключ
+# (модель, память, цвет), а индекс хранит для каждого ключа предложения,
+# отсортированные по цене, — ответ на «где дешевле» это поиск в словаре.
+
+# Перекрытие при подтягивании записей из кеша, секунд
+REFRESH_OVERLAP = 5.0
+
+# Ключ товара: (модель, память, цвет); None — «любой»
+ProductKey = Tuple[str, Optional[str], Optional[str]]
+
+# Цвета: каноническое имя → варианты написания (сначала ищем составные)
+COLORS = {
+    "space black": ["space black", "чёрный космос", "черный космос"],
+    "space gray": ["space gray", "space grey"],
+    "deep blue": ["deep blue"],
+    "mist blue": ["mist blue"],
+    "cosmic orange": ["cosmic orange"],
+    "natural titanium": ["natural titanium"],
+    "black": ["black", "чёрный", "черный"],
+    "white": ["white", "белый"],
+    "blue": ["blue", "синий", "голубой"],
+    "silver": ["silver", "серебристый"],
+    "gold": ["gold", "золотой"],
+    "green": ["green", "зелёный", "зеленый"],
+    "pink": ["pink", "розовый"],
+    "purple": ["purple", "фиолетовый"],
+    "red": ["red", "красный"],
+    "gray": ["gray", "grey", "серый"],
+    "yellow": ["yellow", "жёлтый", "желтый"],
+    "ultramarine": ["ultramarine"],
+    "lavender": ["lavender"],
+    "sage": ["sage"],
+}
+
+# Все варианты написания, от длинных к коротким: «deep blue» раньше «blue»
+_COLOR_WORDS = sorted(
+    ((word, canon) for canon, words in COLORS.items() for word in words),
+    key=lambda x: -len(x[0]),
+)
+
+_MEMORY_RE = re.compile(r"(\d+)\s*(gb|гб|tb|тб)\b", re.IGNORECASE)
+
+# Семейства моделей: распознаём модель, а не весь заголовок магазина
+_MODEL_PATTERNS = [
+    re.compile(r"iphone\s*(\d+e?|se|air)(?:\s+(pro max|pro|plus|mini))?"),
+    re.compile(r"macbook\s*(air|pro)(?:\s+(\d{2}))?(?:\s+\d{4})?(?:\s+(m\d(?:\s*(?:pro|max))?))?"),
+    re.compile(r"(rtx|gtx|rx)\s*(\d{3,4})(?:\s*(ti super|ti|super|xtx|xt))?"),
+]
+
+# Слова, не влияющие на модель
+_NOISE = {
+    "смартфон", "видеокарта", "ноутбук", "apple", "nvidia", "amd", "geforce", "radeon",
+    "dual", "esim", "nanosim", "sim", "без", "rustore", "+",
+}
+
+
+def normalize_memory(text: Optional[str]) -> Optional[str]:
+    """«512 ГБ», «16Gb», «1 TB» → «512GB», «16GB», «1TB»; несколько — через «+», по возрастанию."""
+    if not text:
+        return None
+
+    found = []
+    for size, unit in _MEMORY_RE.findall(text):
+        unit = "TB" if unit.lower() in ("tb", "тб") else "GB"
+        found.append((int(size) * (1024 if unit == "TB" else 1), f"{int(size)}{unit}"))
+
+    if not found:
+        return None
+    return "+".join(v for _, v in sorted(set(found)))
+
+
+def normalize_color(text: Optional[str]) -> Optional[str]:
+    if not text:
+        return None
+    low = text.lower()
+    for word, canon in _COLOR_WORDS:
+        if re.search(rf"(?<!\w){re.escape(word)}(?!\w)", low):
+            return canon
+    return None
+
+
+def normalize_model(text: str) -> str:
+    """Модель без памяти, цвета и служебных слов: «iphone 17 pro», «rtx 5060 ti»."""
+    low = (text or "").lower().replace("ё", "е")
+    low = re.sub(r"\(.*?\)", " ", low)
+    low = _MEMORY_RE.sub(" ", low)
+    for word, _ in _COLOR_WORDS:
+        low = re.sub(rf"(?<!\w){re.escape(word.replace('ё', 'е'))}(?!\w)", " ", low)
+    low = re.sub(r"\s+", " ", low).strip()
+
+    for pattern in _MODEL_PATTERNS:
+        m = pattern.search(low)
+        if m:
+            # Год выпуска у MacBook пишут не все магазины — в ключ не берём
+            model = re.sub(r"^(macbook.*?)\s+20\d\d\b", r"\1", m.group(0))
+            return re.sub(r"\s+", " ", model).strip()
+
+    return " ".join(w for w in low.split() if w not in _NOISE)
+
+
+def product_key(name: str, memory: Optional[str] = None, color: Optional[str] = None) -> ProductKey:
+    """Нормализованный ключ товара; поля memory/color — запасной вариант, если в названии их нет."""
+    return (
+        normalize_model(name),
+        normalize_memory(name) or normalize_memory(memory),
+        normalize_color(name) or normalize_color(color),
+    )
+
+
+def item_key(item: ProductResult) -> ProductKey:
+    return product_key(item.name or "", item.memory, item.color)
+
+
+def _wildcards(key: ProductKey) -> List[ProductKey]:
+    """Ключ и его обобщения — чтобы «iPhone 17 Pro» без памяти/цвета тоже находился."""
+    model, memory, color = key
+    keys = {key, (model, memory, None), (model, None, color), (model, None, None)}
+    return list(keys)
+
+
+class OfferIndex:
+    """
+    Ключ товара → предложения, отсортированные по цене.
+    Обновляется по мере прихода результатов; одна ссылка — одно предложение.
+    Предложения старше LIFETIME (цена в кеше уже устарела) не показываются.
+    """
+
+    def __init__(self):
+        self._offers: Dict[ProductKey, List[tuple]] = {}
+        # ссылка → (предложение, ключи, время цены)
+        self._by_url: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        # Время самой свежей записи кеша, уже попавшей в индекс
+        self._since = 0.0
+        self._refresh_lock = threading.Lock()
+
+    def add(self, item: ProductResult, ts: Optional[float] = None) -> None:
+        """Добавить/обновить предложение (без цены — убрать). ts — когда получена цена."""
+        url = item.url
+        if not url:
+            return
+        ts = ts or time.time()
+
+        with self._lock:
+            old = self._by_url.get(url)
+            if old is not None and old[0][2] == item:
+                # Та же цена — только продлеваем (без повторного разбора названия)
+                self._by_url[url] = (old[0], old[1], max(old[2], ts))
+                return
+
+            self._remove(url)
+            if not item.price or not item.name:
+                return
+
+            # (цена, ссылка) — сортировка по цене, при равной — стабильно по ссылке
+            entry = (item.price, url, item)
+            keys = _wildcards(item_key(item))
+            for key in keys:
+                bisect.insort(self._offers.setdefault(key, []), entry, key=lambda e: (e[0], e[1]))
+            self._by_url[url] = (entry, keys, ts)
+
+    def remove(self, url: str) -> None:
+        with self._lock:
+            self._remove(url)
+
+    def _remove(self, url: str) -> None:
+        old = self._by_url.pop(url, None)
+        if old is None:
+            return
+        entry, keys, _ = old
+        for key in keys:
+            offers = self._offers.get(key)
+            if offers and entry in offers:
+                offers.remove(entry)
+            if not offers:
+                self._offers.pop(key, None)
+
+    def cheapest(self, query: str) -> List[ProductResult]:
+        """Предложения по запросу, от дешёвого к дорогому (поиск по словарю)."""
+        cutoff = time.time() - LIFETIME
+        with self._lock:
+            offers = list(self._offers.get(product_key(query), []))
+            return [item for _, url, item in offers if self._by_url[url][2] >= cutoff]
+
+    def refresh_from_cache(self) -> None:
+        """
+        Подтянуть результаты, записанные в кеш другими процессами (воркерами):
+        только записи новее прошлого обновления и не старше LIFETIME.
+        Синхронный — из бота вызывать через asyncio.to_thread.
+        Если обновление уже идёт в другом потоке — не ждём, ответим по текущему индексу.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+
+        try:
+            now = time.time()
+            cutoff = now - LIFETIME
+
+            # С небольшим перекрытием: запись с чуть более ранним временем
+            # могла зафиксироваться уже после прошлого обновления
+            for ts, item in cached_results_since(max(self._since - REFRESH_OVERLAP, cutoff)):
+                self.add(item, ts)
+                self._since = max(self._since, ts)
+
+            # Устаревшие цены убираем из индекса совсем
+            with self._lock:
+                expired = [url for url, (_, _, ts) in self._by_url.items() if ts < cutoff]
+                for url in expired:
+                    self._remove(url)
+        finally:
+            self._refresh_lock.release()
+
+    def __len__(self):
+        return len(self._by_url)
+
+
+# Общий индекс процесса — его пополняет движок парсинга
+INDEX = OfferIndex()
@@ -1,20 +1,174 @@
 import json
+import threading
+import time
 from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
-#Загружает products.json, который хранит список ссылок для парсинга
-def load_products():
-    ROOT = Path(__file__).resolve().parent.parent  # корень проекта
+# Конфиг товаров (config/products.json) загружается один раз и держится в памяти
+# вместе с индексами. Файл проверяется по mtime не чаще раза в CHECK_SECONDS —
+# правки подхватываются без перезапуска бота, подписчики узнают, что добавилось/пропало.
+
+ROOT = Path(__file__).resolve().parent.parent  # корень проекта
+
+CONFIG_FILE = ROOT / "config" / "products.json"
+
+# Как часто проверять, не изменился ли файл
+CHECK_SECONDS = 2.0
+
+# Товар из конфига: (ключ магазина, ссылка, название)
+ProductId = Tuple[str, str, Optional[str]]
+
+# Подписчик: callback(добавленные, удалённые)
+Listener = Callable[[List[ProductId], List[ProductId]], None]
+
+
+def validate_products(data) -> None:
+    """
+    Проверка структуры products.json:
+    {"kns": [{"name": ..., "url": ...}], "kns_catalog": [{"url": ..., "pages": 5}], ...}
+    """
+    from parsers.sites import SITES
+
+    if not isinstance(data, dict):
+        raise ValueError("products.json: ожидается объект {магазин: [товары]}")
+
+    for section, entries in data.items():
+        site = section.removesuffix("_catalog")
+        if site not in SITES:
+            raise ValueError(f"products.json: неизвестный магазин «{section}»")
+        if section != site and SITES[site].listing is None:
+            raise ValueError(f"products.json: у магазина {SITES[site].title} нет режима листинга («{section}»)")
+        if not isinstance(entries, list):
+            raise ValueError(f"products.json: «{section}» должен быть списком")
+
+        for n, p in enumerate(entries, start=1):
+            where = f"products.json: {section}[{n}]"
+            if not isinstance(p, dict):
+                raise ValueError(f"{where}: ожидается объект")
+            url = p.get("url")
+            if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+                raise ValueError(f"{where}: нет ссылки url")
+            if p.get("name") is not None and not isinstance(p["name"], str):
+                raise ValueError(f"{where}: name должен быть строкой")
+            if "pages" in p and (not isinstance(p["pages"], int) or p["pages"] < 1):
+                raise ValueError(f"{where}: pages должен быть целым ≥ 1")
+
+
+class ProductCatalog:
+    """
+    Товары из products.json с индексами по магазину и по ссылке.
+    Перезагрузка атомарная: новый снимок собирается целиком и подменяет старый;
+    если новый файл битый — остаётся прежний снимок.
+    """
+
+    def __init__(self, path=None, check_seconds: float = CHECK_SECONDS):
+        self.path = Path(path) if path else CONFIG_FILE
+        self.check_seconds = check_seconds
+
+        self._products: Optional[Dict] = None
+        self._by_site: Dict[str, Tuple[Dict, ...]] = {}
+        self._by_id: Dict[Tuple[str, str], Dict] = {}
+        self._sig = None
+        self._checked = 0.0
+        self._listeners: List[Listener] = []
+        self._lock = threading.Lock()
 
-    config_path = ROOT / "config" / "products.json"
+    def _file_sig(self):
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
 
-    # Проверка существования файла
-    if not config_path.exists():
-        raise FileNotFoundError(
-            f"Файл не найден: {config_path}\n"
-            "Убедись, что products.json находится в папке config/"
-        )
+    def load(self) -> bool:
+        """
+        Прочитать файл, если он изменился. Возвращает True, если снимок обновился.
+        Первая загрузка падает с ошибкой; при перезагрузке ошибка только печатается.
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            sig = self._file_sig()
+            if sig is not None and sig == self._sig:
+                return False
 
-    # Загружаем JSON
-    with config_path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+            first = self._products is None
+            try:
+                if sig is None:
+                    raise FileNotFoundError(
+                        f"Файл не найден: {self.path}\n"
+                        "Убедись, что products.json находится в папке config/"
+                    )
+                with self.path.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+                validate_products(data)
+            except Exception as e:
+                if first:
+                    raise
+                self._sig = sig  # не перечитываем тот же битый файл каждые пару секунд
+                print(f"[WARN] products.json не перезагружен, работаем со старым: {e}")
+                return False
 
+            old_ids = self.ids()
+            self._products = data
+            self._by_site = {key: tuple(items) for key, items in data.items()}
+            self._by_id = {
+                (key, p["url"]): p
+                for key, items in data.items() if not key.endswith("_catalog")
+                for p in items
+            }
+            self._sig = sig
+            new_ids = self.ids()
+            listeners = list(self._listeners)
+
+        if first:
+            print(f"[INFO] products.json: {len(self._by_id)} товаров")
+            return True
+
+        added = [i for i in new_ids if i not in old_ids]
+        removed = [i for i in old_ids if i not in new_ids]
+        print(f"[INFO] products.json перезагружен: +{len(added)} −{len(removed)}")
+
+        for listener in listeners:
+            try:
+                listener(added, removed)
+            except Exception as e:
+                print(f"[ERROR] подписчик {listener.__name__} на products.json: {e!r}")
+        return True
+
+    def refresh(self) -> None:
+        """Перечитать файл, если прошло CHECK_SECONDS с прошлой проверки."""
+        if self._products is None or time.monotonic() - self._checked >= self.check_seconds:
+            self.load()
+
+    def ids(self) -> Dict[ProductId, None]:
+        """Товары (без листингов категорий) — упорядоченный набор (магазин, ссылка, название)."""
+        return {(key, url, p.get("name")): None for (key, url), p in self._by_id.items()}
+
+    def products(self) -> Dict:
+        """Весь конфиг в формате products.json (общий снимок — не изменять)."""
+        self.refresh()
+        return self._products
+
+    def for_site(self, key: str) -> Tuple[Dict, ...]:
+        """Товары одного магазина (или листинги: key="kns_catalog")."""
+        self.refresh()
+        return self._by_site.get(key, ())
+
+    def get(self, site: str, url: str) -> Optional[Dict]:
+        """Товар по магазину и ссылке (None, если его убрали из конфига)."""
+        self.refresh()
+        return self._by_id.get((site, url))
+
+    def subscribe(self, listener: Listener) -> None:
+        """listener(added, removed) вызывается после каждой перезагрузки с изменениями."""
+        with self._lock:
+            self._listeners.append(listener)
+
+
+CATALOG = ProductCatalog()
+
+
+#Загружает products.json, который хранит список ссылок для парсинга
+def load_products():
+    # Из памяти; файл перечитывается, только если его изменили
+    return CATALOG.products()
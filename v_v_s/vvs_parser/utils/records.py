@@ -0,0 +1,94 @@
+import struct
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Tuple
+
+# Типизированный результат парсинга — общий для всех магазинов.
+# Компактная запись (__slots__, без словаря ключей на каждый товар)
+# и бинарная упаковка для кеша и передачи между процессами.
+
+# Версия схемы: меняется при изменении набора/порядка полей или формата упаковки
+SCHEMA_VERSION = 1
+
+# Необязательные строковые поля: бит в маске = поле равно None
+OPTIONAL = ("name", "memory", "memory_type", "color", "error")
+
+# Строки записи склеиваются через \0 и декодируются одним вызовом
+SEP = "\x00"
+
+# Цена None
+NO_PRICE = -1
+
+# Упаковка: цена (i64), маска None (u8), длина склеенных строк (u32), строки
+_HEAD = struct.Struct("<qBI")
+
+
+@dataclass(slots=True)
+class ProductResult:
+    site: str
+    url: str
+    name: Optional[str] = None
+    price: Optional[int] = None
+    memory: Optional[str] = None
+    memory_type: Optional[str] = None
+    color: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        """Словарь в прежнем формате (только заполненные необязательные поля)."""
+        return {f.name: getattr(self, f.name) for f in fields(self)
+                if f.name in ("site", "url", "name", "price") or getattr(self, f.name) is not None}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ProductResult":
+        """Из старого словаря результата (cache.json); лишние ключи игнорируются."""
+        price = data.get("price")
+        return cls(
+            site=data["site"],
+            url=data["url"],
+            name=data.get("name"),
+            price=int(price) if price is not None else None,
+            memory=data.get("memory"),
+            memory_type=data.get("memory_type"),
+            color=data.get("color"),
+            error=data.get("error"),
+        )
+
+    def strings(self) -> Tuple[List[str], int]:
+        """Строковые поля по порядку (None → "") и маска None."""
+        mask = 0
+        values = [self.site, self.url]
+        for bit, name in enumerate(OPTIONAL):
+            value = getattr(self, name)
+            if value is None:
+                mask |= 1 << bit
+                value = ""
+            values.append(value.replace(SEP, ""))
+        return values, mask
+
+    @classmethod
+    def from_strings(cls, values: List[str], price: int, mask: int) -> "ProductResult":
+        """Обратно к strings(): values — site, url и необязательные поля по порядку."""
+        site, url, name, memory, memory_type, color, error = values
+        return cls(
+            site, url,
+            None if mask & 1 else name,
+            None if price == NO_PRICE else price,
+            None if mask & 2 else memory,
+            None if mask & 4 else memory_type,
+            None if mask & 8 else color,
+            None if mask & 16 else error,
+        )
+
+    def pack(self) -> bytes:
+        """Бинарная упаковка записи (для кеша и передачи между процессами)."""
+        values, mask = self.strings()
+        blob = SEP.join(values).encode("utf-8")
+        return _HEAD.pack(NO_PRICE if self.price is None else self.price, mask, len(blob)) + blob
+
+    @classmethod
+    def unpack(cls, buf, offset: int = 0) -> Tuple["ProductResult", int]:
+        """Распаковать запись из buf начиная с offset; возвращает (запись, новый offset)."""
+        price, mask, length = _HEAD.unpack_from(buf, offset)
+        offset += _HEAD.size
+        values = str(buf[offset:offset + length], "utf-8").split(SEP)
+        return cls.from_strings(values, price, mask), offset + length
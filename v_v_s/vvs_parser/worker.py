@@ -0,0 +1,128 @@
+"""
+Воркеры очереди парсинга (utils/jobqueue.py).
+
+    python worker.py enqueue                 # поставить товары из config/products.json
+    python worker.py enqueue --every 600     # продюсер: ставить заново каждые 10 минут
+                                             # (правки products.json — сразу)
+    python worker.py work --procs 4          # 4 процесса-воркера на этой машине
+    python worker.py work --procs 4 --once   # разобрать очередь и выйти
+    python worker.py stats                   # сколько задач в каком статусе
+
+Воркеры забирают задачи с арендой, парсят товар общим движком
+и пишут результат в общий кеш — бот отдаёт его без парсинга.
+Очередь и кеш — SQLite в режиме WAL: воркеры запускаются на той же машине,
+что и бот (WAL не работает на сетевых файловых системах).
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import time
+
+from utils.cache import init_cache
+from utils.jobqueue import JobQueue, LEASE_SECONDS
+from utils.products import load_products, CATALOG
+
+# Пауза, если очередь пуста
+POLL_SECONDS = 2
+
+
+def run_worker(n: int, lease: int, once: bool):
+    """Цикл одного процесса-воркера."""
+    from parsers.registry import get_parser
+
+    init_cache()
+    queue = JobQueue(lease_seconds=lease)
+    parse_product = get_parser("parse_product")
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"[worker {n}] запущен как {worker}")
+
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            if once:
+                break
+            time.sleep(POLL_SECONDS)
+            continue
+
+        # Товар убрали из products.json, пока задача ждала
+        if CATALOG.get(job["site"], job["url"]) is None:
+            queue.complete(job["id"], worker)
+            continue
+
+        print(f"[worker {n}] {job['site']} → {job['url']} (попытка {job['attempts']})")
+        try:
+            result = parse_product(job["site"], job["url"], job["name"] or None, fresh=True)
+        except Exception as e:
+            queue.fail(job["id"], worker, repr(e))
+            continue
+
+        if result.error:
+            queue.fail(job["id"], worker, result.error)
+        elif not queue.complete(job["id"], worker):
+            print(f"[worker {n}] аренда {job['id']} истекла до завершения — задачу забрал другой воркер")
+
+    queue.close()
+    print(f"[worker {n}] очередь пуста, выходим")
+
+
+def cmd_enqueue(args):
+    queue = JobQueue()
+
+    # Добавленные в products.json товары ставим сразу, убранные — снимаем
+    def on_products_changed(added, removed):
+        for site, url, name in added:
+            queue.enqueue(site, url, name)
+        for site, url, name in removed:
+            queue.remove(site, url, name)
+        print(f"Конфиг изменён: +{len(added)} −{len(removed)}, очередь: {queue.stats()}")
+
+    CATALOG.subscribe(on_products_changed)
+
+    while True:
+        added = queue.enqueue_products(load_products())
+        print(f"Поставлено задач: {added}, очередь: {queue.stats()}")
+        if not args.every:
+            break
+
+        next_run = time.monotonic() + args.every
+        while time.monotonic() < next_run:
+            time.sleep(max(0, min(CATALOG.check_seconds, next_run - time.monotonic())))
+            CATALOG.refresh()
+
+
+def cmd_work(args):
+    procs = [
+        multiprocessing.Process(target=run_worker, args=(n, args.lease, args.once))
+        for n in range(args.procs)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+
+def cmd_stats(args):
+    print(JobQueue().stats())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Очередь парсинга с воркерами")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p_enqueue = sub.add_parser("enqueue", help="поставить товары из products.json")
+    p_enqueue.add_argument("--every", type=int, default=0, help="повторять каждые N секунд")
+
+    p_work = sub.add_parser("work", help="запустить воркеры")
+    p_work.add_argument("--procs", type=int, default=os.cpu_count() or 1)
+    p_work.add_argument("--lease", type=int, default=LEASE_SECONDS, help="аренда задачи, секунд")
+    p_work.add_argument("--once", action="store_true", help="выйти, когда очередь опустеет")
+
+    sub.add_parser("stats", help="статистика очереди")
+
+    args = ap.parse_args()
+    {"enqueue": cmd_enqueue, "work": cmd_work, "stats": cmd_stats}[args.cmd](args)
+
+
+if __name__ == "__main__":
+    main()